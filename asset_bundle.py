@@ -0,0 +1,241 @@
+"""
+Raw-pixel asset bundle: every image the game loads, pre-scaled and stored
+as raw pixels in one file, so a cold start needs no PNG/GIF decoding and no
+scaling.
+
+Layout: an 8-byte magic, a little-endian uint32 index length, the JSON index,
+then the pixel blobs (each 16-byte aligned, offsets relative to the first).
+The index lists, per (path, w, h), the blob offset, pixel size, byte format
+and load_image's surface mode, plus the source files' mtime/size so stale
+entries are skipped and loaded from the source file instead.
+
+At runtime the file is memory-mapped (copy-on-write) and surfaces are made
+with pygame.image.frombuffer straight over the mapping, so only the assets
+actually used are ever read from disk. Images with per-pixel alpha are
+stored in the display's native 32-bit layout and used in place, without a
+copy; opaque and colorkey images are stored as RGB and converted once (a
+plain pixel copy), since blitting them from a non-native layout every frame
+would cost far more than that copy.
+
+    python asset_bundle.py build                  # writes assets.bundle
+    python asset_bundle.py build --output other.bundle
+    python asset_bundle.py info
+
+The game opens assets.bundle automatically when it exists; set the
+ASSET_BUNDLE environment variable to another path, or to an empty string to
+load the source images instead.
+"""
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+MAGIC = b"IWBTGPX1"
+HEADER = struct.Struct("<8sI")
+ALIGN = 16
+DEFAULT_PATH = "assets.bundle"
+
+# Byte formats for pygame.image.tobytes/frombuffer. BGRA bytes are the
+# ARGB8888 surfaces convert_alpha() makes on little-endian machines.
+ALPHA_FORMAT = "BGRA"
+OPAQUE_FORMAT = "RGB"
+
+
+def blob_start(index_length):
+    """File offset of the pixel data; blob offsets in the index are relative to it."""
+    start = HEADER.size + index_length
+    return start + -start % ALIGN
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class AssetBundle:
+    def __init__(self, path, alpha_mode="alpha", colorkey_mode="colorkey", colorkey_color=(255, 0, 255)):
+        """alpha_mode/colorkey_mode: the surface mode names used by the game's loader."""
+        self.path = path
+        self.alpha_mode = alpha_mode
+        self.colorkey_mode = colorkey_mode
+        self.colorkey_color = colorkey_color
+        self.file = open(path, "rb")
+        # Copy-on-write: nothing is read until used, and a surface that is
+        # ever written to gets private pages instead of touching the file.
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, index_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an asset bundle")
+        index = json.loads(bytes(self.map[HEADER.size:HEADER.size + index_length]))
+        self.sources = index["sources"]
+        self.images = {(path, w, h): entry for path, w, h, entry in index["images"]}
+        self.animations = {(path, w, h): entry for path, w, h, entry in index["animations"]}
+        self.view = memoryview(self.map)[blob_start(index_length):]
+        self._fresh = {}  # path -> source file unchanged since the bundle was built
+        self._native_masks = None
+
+    def fresh(self, path):
+        if path not in self._fresh:
+            try:
+                self._fresh[path] = path in self.sources and _source_stamp(path) == self.sources[path][:2]
+            except OSError:
+                self._fresh[path] = False
+        return self._fresh[path]
+
+    def native_size(self, path):
+        """The source image's own size, without decoding it, or None."""
+        if self.fresh(path):
+            return tuple(self.sources[path][2:4])
+        return None
+
+    def _surface(self, blob, mode):
+        w, h = blob["size"]
+        fmt = blob["format"]
+        length = w * h * len(fmt)
+        surface = pygame.image.frombuffer(self.view[blob["offset"]:blob["offset"] + length], (w, h), fmt)
+        if mode == self.alpha_mode:
+            if self._native_masks is None:
+                self._native_masks = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()
+            if surface.get_masks() != self._native_masks:
+                surface = surface.convert_alpha()  # Another pixel layout on this machine
+            return surface
+        surface = surface.convert()
+        if mode == self.colorkey_mode:
+            surface.set_colorkey(self.colorkey_color, pygame.RLEACCEL)
+        return surface
+
+    def image(self, path, w=None, h=None):
+        """Returns (surface, mode) for a bundled image, or None if missing or stale."""
+        entry = self.images.get((path, w, h))
+        if entry is None or not self.fresh(path):
+            return None
+        return self._surface(entry, entry["mode"]), entry["mode"]
+
+    def animation(self, path, w, h):
+        """Returns (frames, delays, mode) for a bundled animation, or None."""
+        entry = self.animations.get((path, w, h))
+        if entry is None or not self.fresh(path):
+            return None
+        return [self._surface(blob, entry["mode"]) for blob in entry["frames"]], entry["delays"], entry["mode"]
+
+
+def open_bundle(path):
+    """Opens a bundle if the file exists; None (with a warning if unreadable) otherwise."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return AssetBundle(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Warning: ignoring asset bundle '{path}': {e}")
+        return None
+
+# --------------------
+# Building
+# --------------------
+class BundleWriter:
+    def __init__(self, alpha_mode="alpha"):
+        self.alpha_mode = alpha_mode
+        self.blobs = []
+        self.size = 0
+        self.sources = {}
+        self.images = []
+        self.animations = []
+
+    def _add_source(self, path):
+        if path not in self.sources:
+            w, h = pygame.image.load(path).get_size()
+            self.sources[path] = _source_stamp(path) + [w, h]
+
+    def _add_blob(self, surface, mode):
+        fmt = ALPHA_FORMAT if mode == self.alpha_mode else OPAQUE_FORMAT
+        data = pygame.image.tobytes(surface, fmt)
+        self.size += -self.size % ALIGN
+        blob = {"offset": self.size, "size": list(surface.get_size()), "format": fmt}
+        self.blobs.append((self.size, data))
+        self.size += len(data)
+        return blob
+
+    def add_image(self, path, w, h, surface, mode):
+        """surface: the image as load_image returns it (scaled and converted for its mode)."""
+        self._add_source(path)
+        self.images.append([path, w, h, dict(self._add_blob(surface, mode), mode=mode)])
+
+    def add_animation(self, path, w, h, frames, delays, mode):
+        self._add_source(path)
+        self.animations.append([path, w, h, {"frames": [self._add_blob(frame, mode) for frame in frames],
+                                             "delays": list(delays), "mode": mode}])
+
+    def write(self, path):
+        index = json.dumps({"sources": self.sources, "images": self.images,
+                            "animations": self.animations}).encode()
+        start = blob_start(len(index))
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(index)))
+            f.write(index)
+            for offset, data in self.blobs:
+                f.seek(start + offset)
+                f.write(data)
+        os.replace(temp_path, path)  # Never leaves a half-written bundle behind
+        return start + self.size
+
+
+def build(output=DEFAULT_PATH):
+    """Loads every level's assets from the source files and writes them to a bundle."""
+    os.environ["ASSET_BUNDLE"] = ""  # Never build from an existing bundle
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        import game
+        # Building each level (and firing a spell) loads every asset the game uses.
+        for config in game.levels_config:
+            game.Level(config, 1).unload()
+        game.Bullet(0, 0, 1, image_path="images/environment/spells/fire_ball_spell.png")
+    keys = set(game.image_cache)
+    for path, size, _ in game.parallax_cache:
+        keys.add((path,) + (tuple(size) if size else (None, None)))
+    writer = BundleWriter(game.ALPHA)
+    for path, w, h in sorted(keys, key=str):
+        image = game.load_image(path, w, h)
+        if image is not None:
+            writer.add_image(path, w, h, image, game.image_modes[path])
+    for (path, w, h), animation in sorted(game.animation_cache.items(), key=lambda item: str(item[0])):
+        if animation is not None:
+            delays = [delay for _, delay in game.gif_frame_cache[path]]
+            writer.add_animation(path, w, h, animation.frames, delays, game.image_modes[path])
+    size = writer.write(output)
+    print(f"Wrote {len(writer.images)} images and {len(writer.animations)} animations "
+          f"({size / 1024:.0f} KB) to {output}")
+
+
+def info(path=DEFAULT_PATH):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    bundle = AssetBundle(path)
+    stale = sorted(p for p in bundle.sources if not bundle.fresh(p))
+    print(f"{path}: {len(bundle.images)} images, {len(bundle.animations)} animations, "
+          f"{len(bundle.sources)} source files, {os.path.getsize(path) / 1024:.0f} KB")
+    for (p, w, h), entry in sorted(bundle.images.items(), key=str):
+        size = "native size" if w is None else f"{w}x{h}"
+        print(f"  {p} {size} {entry['mode']} {entry['format']}")
+    for (p, w, h), entry in sorted(bundle.animations.items(), key=str):
+        print(f"  {p} {w}x{h} {entry['mode']} {len(entry['frames'])} frames")
+    if stale:
+        print("Stale (changed since the build, loaded from source): " + ", ".join(stale))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Build or inspect the raw-pixel asset bundle.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="load every level's assets and write the bundle")
+    build_parser.add_argument("--output", default=DEFAULT_PATH)
+    info_parser = sub.add_parser("info", help="list a bundle's contents")
+    info_parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    args = parser.parse_args()
+    if args.command == "build":
+        build(args.output)
+    else:
+        info(args.path)
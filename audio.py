@@ -0,0 +1,137 @@
+"""
+Sound effects with preloaded samples and a reserved channel pool.
+
+AudioMixer.warm_up() decodes every effect in SOUND_EFFECTS into a
+pygame.mixer.Sound up front, so play() never touches the disk or a decoder
+during gameplay. Effects whose file is not in sounds/ yet are synthesized
+(short tones and noise built with NumPy), so the game has audio until real
+samples are dropped in.
+
+Effects only play on channels reserved for them. When every channel is busy,
+play() steals the oldest voice of the lowest priority that is not more
+important than the new sound; each effect also has a voice limit and a
+minimum re-trigger interval, so bursts (volleys, spirals) can't flood the
+pool. Before warm_up() (e.g. headless runs) play() does nothing.
+"""
+import os
+
+import numpy as np
+import pygame
+
+SOUND_DIR = "sounds"
+SAMPLE_RATE = 44100
+
+# priority: higher steals from lower. voices: max copies playing at once.
+# min_interval: ms before the same effect can start again.
+# synth: (shape, start Hz, end Hz, seconds) used when the file is missing.
+SOUND_EFFECTS = {
+    "spell":          {"file": "spell.wav", "priority": 2, "voices": 3, "min_interval": 40,
+                       "synth": ("sweep", 900, 400, 0.12)},
+    "boss_attack":    {"file": "boss_attack.wav", "priority": 1, "voices": 4, "min_interval": 30,
+                       "synth": ("sweep", 320, 110, 0.2)},
+    "boss_hit":       {"file": "boss_hit.wav", "priority": 2, "voices": 3, "min_interval": 40,
+                       "synth": ("noise", 2000, 600, 0.08)},
+    "player_hit":     {"file": "player_hit.wav", "priority": 4, "voices": 2, "min_interval": 80,
+                       "synth": ("noise", 900, 200, 0.18)},
+    "pickup":         {"file": "pickup.wav", "priority": 3, "voices": 2, "min_interval": 0,
+                       "synth": ("sweep", 660, 1320, 0.15)},
+    "level_complete": {"file": "level_complete.wav", "priority": 5, "voices": 1, "min_interval": 0,
+                       "synth": ("arpeggio", 523, 1047, 0.6)},
+    "game_over":      {"file": "game_over.wav", "priority": 5, "voices": 1, "min_interval": 0,
+                       "synth": ("sweep", 440, 70, 0.9)},
+}
+
+
+def synthesize(shape, start_hz, end_hz, seconds, rate=SAMPLE_RATE, channels=2):
+    """Builds a short 16-bit effect with a fade-out envelope."""
+    n = max(1, int(rate * seconds))
+    t = np.arange(n) / rate
+    if shape == "arpeggio":
+        # Four rising notes between start and end.
+        steps = np.minimum((t / seconds * 4).astype(int), 3)
+        freq = start_hz * (end_hz / start_hz) ** (steps / 3)
+    else:
+        freq = np.linspace(start_hz, end_hz, n)
+    phase = 2 * np.pi * np.cumsum(freq) / rate
+    if shape == "noise":
+        wave = np.random.default_rng(0).uniform(-1, 1, n) * (0.5 + 0.5 * np.sign(np.sin(phase)))
+    else:
+        wave = np.sign(np.sin(phase)) * 0.6 + np.sin(phase) * 0.4
+    envelope = np.linspace(1.0, 0.0, n) ** 2
+    samples = (wave * envelope * 0.3 * 32767).astype(np.int16)
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return np.ascontiguousarray(samples)
+
+
+class AudioMixer:
+    def __init__(self, channels=16):
+        self.channel_count = channels
+        self.sounds = {}
+        self.channels = []
+        self.voices = []   # Per channel: (effect, priority, start ms) or None
+        self.last_played = {}
+        self.enabled = False
+
+    def warm_up(self):
+        """Opens the mixer and decodes every effect. Returns False if audio is unavailable."""
+        try:
+            if pygame.mixer.get_init() is None:
+                pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Warning: audio disabled ({e})")
+            return False
+        rate, size, out_channels = pygame.mixer.get_init()
+        pygame.mixer.set_num_channels(self.channel_count)
+        # Reserved channels are never picked by Sound.play(); only we use them.
+        pygame.mixer.set_reserved(self.channel_count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+        self.voices = [None] * self.channel_count
+        for name, effect in SOUND_EFFECTS.items():
+            path = os.path.join(SOUND_DIR, effect["file"])
+            try:
+                if os.path.exists(path):
+                    self.sounds[name] = pygame.mixer.Sound(path)
+                elif size == -16:
+                    self.sounds[name] = pygame.sndarray.make_sound(synthesize(*effect["synth"], rate, out_channels))
+            except pygame.error as e:
+                print(f"Warning: could not load sound '{name}': {e}")
+        self.enabled = True
+        return True
+
+    def _pick_channel(self, name, priority):
+        free = None
+        same = []
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                self.voices[index] = None
+                if free is None:
+                    free = index
+            elif self.voices[index] and self.voices[index][0] == name:
+                same.append(index)
+        if len(same) >= SOUND_EFFECTS[name]["voices"]:
+            return min(same, key=lambda i: self.voices[i][2])  # Restart the oldest copy
+        if free is not None:
+            return free
+        candidates = [i for i, voice in enumerate(self.voices) if voice and voice[1] <= priority]
+        if not candidates:
+            return None  # Everything playing matters more
+        return min(candidates, key=lambda i: (self.voices[i][1], self.voices[i][2]))
+
+    def play(self, name):
+        """Starts an effect without blocking; returns its Channel or None if skipped."""
+        if not self.enabled or name not in self.sounds:
+            return None
+        effect = SOUND_EFFECTS[name]
+        now = pygame.time.get_ticks()
+        last = self.last_played.get(name)
+        if last is not None and now - last < effect["min_interval"]:
+            return None
+        index = self._pick_channel(name, effect["priority"])
+        if index is None:
+            return None
+        channel = self.channels[index]
+        channel.play(self.sounds[name])
+        self.voices[index] = (name, effect["priority"], now)
+        self.last_played[name] = now
+        return channel
@@ -0,0 +1,96 @@
+"""
+Boss attack scripts compiled into velocity tables.
+
+A script maps a boss phase to a list of emitter entries. Every entry is
+compiled once (at level load) into volleys of precomputed (vx, vy) pairs, so
+firing a volley needs no trigonometry. Angles are in degrees, 0 = right and
+90 = down (screen coordinates); speeds are pixels per frame and times are ms.
+
+Entry types and their keys (defaults in brackets):
+    ring    count, speed, angle [0], arc [360] - evenly spaced shots; with an
+            arc below 360 the shots span the arc centred on angle
+    spiral  arms, speed, turn, volleys, interval, angle [0] - a ring of arms
+            rotated by turn degrees every volley
+    aimed   count [1], spread [0], speed, volleys [1], interval [0] - a fan
+            of count shots over spread degrees, pointed at the player
+    wave    count [1], spread [0], speed, angle [90], amplitude, period,
+            volleys, interval - a fan whose direction sways by amplitude
+            degrees, one full sway every period volleys
+Every entry also takes delay [0] (ms before its first volley), origin
+["center" or "bottom"], image, size [40] and burst: a nested entry plus
+"after" (ms) that each of its bullets turns into after that long.
+"""
+import math
+
+DEFAULT_IMAGE = "images/environment/spells/bluefire.gif"
+
+
+class Volley:
+    __slots__ = ("delay", "velocities")
+
+    def __init__(self, delay, velocities):
+        self.delay = delay            # ms after the attack starts
+        self.velocities = velocities  # tuple of (vx, vy)
+
+
+class Emitter:
+    __slots__ = ("volleys", "aimed", "origin", "image", "size", "burst", "bullets")
+
+    def __init__(self, volleys, aimed, origin, image, size, burst):
+        self.volleys = volleys
+        self.aimed = aimed      # Velocities are relative to the direction of the player
+        self.origin = origin
+        self.image = image
+        self.size = size
+        self.burst = burst      # (after_ms, Emitter) or None
+        self.bullets = sum(len(v.velocities) for v in volleys)  # Per attack, for pre-allocating
+
+
+def _fan(count, speed, angle, arc):
+    if count <= 0:
+        return ()
+    if arc >= 360:
+        step, start = 360 / count, angle
+    elif count == 1:
+        step, start = 0, angle
+    else:
+        step, start = arc / (count - 1), angle - arc / 2
+    return tuple((speed * math.cos(math.radians(start + i * step)),
+                  speed * math.sin(math.radians(start + i * step))) for i in range(count))
+
+
+def _volleys(angles, delay, interval, count, speed, arc):
+    return [Volley(delay + k * interval, _fan(count, speed, angle, arc)) for k, angle in enumerate(angles)]
+
+
+def compile_entry(entry):
+    kind = entry.get("type")
+    delay = entry.get("delay", 0)
+    speed = entry.get("speed", 8)
+    volleys_n = entry.get("volleys", 1)
+    interval = entry.get("interval", 0)
+    if kind == "ring":
+        volleys = [Volley(delay, _fan(entry["count"], speed, entry.get("angle", 0), entry.get("arc", 360)))]
+    elif kind == "spiral":
+        angles = [entry.get("angle", 0) + k * entry["turn"] for k in range(volleys_n)]
+        volleys = _volleys(angles, delay, interval, entry["arms"], speed, 360)
+    elif kind == "aimed":
+        angles = [0] * volleys_n
+        volleys = _volleys(angles, delay, interval, entry.get("count", 1), speed, entry.get("spread", 0))
+    elif kind == "wave":
+        angle, amplitude, period = entry.get("angle", 90), entry["amplitude"], entry["period"]
+        angles = [angle + amplitude * math.sin(2 * math.pi * k / period) for k in range(volleys_n)]
+        volleys = _volleys(angles, delay, interval, entry.get("count", 1), speed, entry.get("spread", 0))
+    else:
+        raise ValueError(f"Unknown bullet pattern type '{kind}'")
+
+    burst = None
+    if "burst" in entry:
+        burst = (entry["burst"].get("after", 500), compile_entry(entry["burst"]))
+    return Emitter(volleys, kind == "aimed", entry.get("origin", "center"),
+                   entry.get("image", DEFAULT_IMAGE), entry.get("size", 40), burst)
+
+
+def compile_attacks(script):
+    """{phase: [entry, ...]} -> {phase: [Emitter, ...]}. Phase keys may be strings (JSON)."""
+    return {int(phase): [compile_entry(entry) for entry in entries] for phase, entries in script.items()}
@@ -2,8 +2,30 @@ import pygame
 import random
 import sys
 import os
-import math  # For boss attack angle calculations
+import math  # For aiming boss attack patterns
+import weakref
+import argparse
+import atexit
+import json
+import tracemalloc
+import bisect
+import collections
+import itertools
+import numpy as np
+from tilemap import TileMap
+from parallax import ParallaxLayer, ParallaxBackground, make_strip
+from gif_decoder import decode_gif
+from sprite_sheets import slice_sprite_sheet, detect_sprite_grid
+from timer_wheel import TimerWheel
+from bullet_patterns import compile_attacks
+import memory_report
+import snapshots
+from audio import AudioMixer
+from screens import Screen, ScreenStack
+from asset_bundle import open_bundle
+from telemetry import TelemetryWriter
 
+pygame.mixer.pre_init(44100, -16, 2, 512)  # Small buffer so effects start with little latency
 pygame.init()
 
 # --------------------
@@ -12,6 +34,9 @@ pygame.init()
 WIDTH, HEIGHT = 800, 600              # Display (window) size
 MAP_WIDTH, MAP_HEIGHT = 1200, 800     # Full level (map) size
 FPS = 60
+SIM_DT = 1.0          # Simulation step in 60 FPS frames; 2-4 for coarse headless runs
+GRAVITY = 0.8         # Added to vel_y per frame
+MAX_FALL_SPEED = 20   # Terminal velocity (px per frame)
 
 # Colors (fallback colors)
 WHITE  = (255, 255, 255)
@@ -25,7 +50,7 @@ YELLOW = (255, 255, 0)  # For projectiles/spells
 # --------------------
 # Set up the Display
 # --------------------
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
+screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
 pygame.display.set_caption("I Don't Wanna Be The Guy")
 clock = pygame.time.Clock()
 
@@ -36,6 +61,230 @@ DIFFICULTY = {
     "Hard": 2,
 }
 selected_difficulty = "Easy"  # Selected in the main menu
+MEMORY_REPORT = False  # Print a memory report on every level load (--memory-report)
+MEMORY_REPORT_KEY = pygame.K_F9  # Debug key: print a memory report for the current level
+snapshot_server = None  # snapshots.SnapshotServer when started with --serve-snapshots
+telemetry = None  # TelemetryWriter for the session, unless started with --no-telemetry
+audio = AudioMixer()  # Silent until audio.warm_up() (skipped with --mute)
+
+# --------------------
+# Render Target (internal resolution)
+# --------------------
+# The world and HUD are drawn in WIDTH x HEIGHT game coordinates onto an
+# internal surface of RENDER_SCALE times that size, which is scaled to the
+# (resizable, letterboxed) window once per frame. Lower scales cut fill rate:
+# images are drawn from per-scale copies cached once per source image.
+RENDER_SCALE = 1.0
+
+class RenderTarget:
+    def __init__(self, surface, scale=1.0, scale_y=None):
+        self.surface = surface
+        self.scale = scale
+        # Only differs from scale for targets with another aspect ratio (e.g. 84x84).
+        self.scale_y = scale if scale_y is None else scale_y
+        self.unscaled = self.scale == 1 and self.scale_y == 1
+        self._scaled = weakref.WeakKeyDictionary()  # image -> (version, scaled copy)
+
+    def scaled_image(self, image, version=0):
+        entry = self._scaled.get(image)
+        if entry is None or entry[0] != version:
+            w, h = image.get_size()
+            size = (max(1, round(w * self.scale)), max(1, round(h * self.scale_y)))
+            scaled = pygame.transform.scale(image, size)
+            colorkey = image.get_colorkey()
+            if colorkey is not None:
+                scaled.set_colorkey(colorkey, pygame.RLEACCEL)
+            entry = (version, scaled)
+            self._scaled[image] = entry
+        return entry[1]
+
+    def _point(self, pos):
+        return (round(pos[0] * self.scale), round(pos[1] * self.scale_y))
+
+    def _rect(self, rect):
+        rect = pygame.Rect(rect)
+        left, top = self._point(rect.topleft)
+        right, bottom = self._point(rect.bottomright)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def blit(self, image, pos, version=0):
+        """version: bump it when image's pixels change in place (e.g. a TileMap)."""
+        if self.unscaled:
+            self.surface.blit(image, pos)
+        else:
+            self.surface.blit(self.scaled_image(image, version), self._point(pos))
+
+    def blit_tiles(self, tile_map, pos):
+        """Blits a TileMap; a scaled copy only re-scales the cells changed since it was made."""
+        image = tile_map.surface
+        if self.unscaled:
+            self.surface.blit(image, pos)
+            return
+        entry = self._scaled.get(image)
+        if entry is not None and entry[0] != tile_map.version:
+            dirty = tile_map.dirty_since(entry[0])
+            if dirty is not None:
+                scaled = entry[1]
+                for rect in dirty:
+                    dest = self._rect(rect)
+                    if dest.width > 0 and dest.height > 0:
+                        pygame.transform.scale(image.subsurface(rect), dest.size, scaled.subsurface(dest))
+                self._scaled[image] = (tile_map.version, scaled)
+        self.surface.blit(self.scaled_image(image, tile_map.version), self._point(pos))
+
+    def blits(self, items):
+        if not self.unscaled:
+            items = [(self.scaled_image(image), self._point(pos)) for image, pos in items]
+        self.surface.blits(items, doreturn=False)
+
+    def fill(self, color, rect=None):
+        if rect is not None and not self.unscaled:
+            rect = self._rect(rect)
+        self.surface.fill(color, rect)
+
+    def draw_rect(self, color, rect):
+        if not self.unscaled:
+            rect = self._rect(rect)
+        pygame.draw.rect(self.surface, color, rect)
+
+def as_render_target(target):
+    return target if isinstance(target, RenderTarget) else RenderTarget(target)
+
+_window_target = RenderTarget(screen)
+_internal_target = None
+
+def get_render_target():
+    """The target to draw this frame's world and HUD onto."""
+    global _window_target, _internal_target
+    window = pygame.display.get_surface()
+    scale = RENDER_SCALE * governor.quality["render_scale"]
+    if scale == 1 and window.get_size() == (WIDTH, HEIGHT):
+        if _window_target.surface is not window:
+            _window_target = RenderTarget(window)
+        return _window_target
+    size = (max(1, round(WIDTH * scale)), max(1, round(HEIGHT * scale)))
+    if _internal_target is None or _internal_target.surface.get_size() != size:
+        _internal_target = RenderTarget(pygame.Surface(size).convert(), scale)
+    return _internal_target
+
+def present_frame(target):
+    """Scales the internal surface into the window, letterboxed, and flips."""
+    window = pygame.display.get_surface()
+    if target.surface is not window:
+        win_w, win_h = window.get_size()
+        fit = min(win_w / WIDTH, win_h / HEIGHT)
+        dest = pygame.Rect(0, 0, int(WIDTH * fit), int(HEIGHT * fit))
+        dest.center = (win_w // 2, win_h // 2)
+        window.fill(BLACK)
+        if dest.width > 0 and dest.height > 0:
+            if dest.size == target.surface.get_size():
+                window.blit(target.surface, dest)
+            else:
+                pygame.transform.scale(target.surface, dest.size, window.subsurface(dest))
+    pygame.display.flip()
+
+class PixelObserver:
+    """
+    Off-screen, low-resolution camera view for vision-based bots and visual
+    checks. render() draws the level and sprites at `size` (e.g. 84x84 or
+    160x120) and returns an (H, W, 3) uint8 array that views the surface's
+    pixels through surfarray, without a copy. The view holds a surface lock, so
+    it is only valid until the next render(); copy it to keep a frame.
+    """
+    def __init__(self, size=(84, 84)):
+        self.size = size
+        surface = pygame.Surface(size).convert()
+        self.target = RenderTarget(surface, size[0] / WIDTH, size[1] / HEIGHT)
+        self.pixels = None
+
+    def render(self, level, player, groups=(), hud=False):
+        self.pixels = None  # Drop our view (and its lock) before drawing again
+        if self.target.surface.get_locked():
+            raise RuntimeError("PixelObserver: a view from the previous render() is still alive; "
+                               "copy the frame instead of keeping the view")
+        camera_offset = get_camera_offset(player)
+        level.draw(self.target, camera_offset)
+        draw_sprite_group([player], self.target, camera_offset)
+        for group in groups:
+            draw_sprite_group(group, self.target, camera_offset)
+        if hud:
+            draw_hud(self.target, player, level, camera_offset)
+        self.pixels = pygame.surfarray.pixels3d(self.target.surface).transpose(1, 0, 2)
+        return self.pixels
+
+# --------------------
+# Frame-time Governor
+# --------------------
+# clock.tick(FPS) only caps the frame rate; when frames run over budget the
+# game just slows down. The governor keeps a rolling average of the work time
+# per frame and steps down through these tiers (each keeps the savings of the
+# ones above it) when over budget, and back up once there is headroom again.
+QUALITY_TIERS = [
+    {"name": "full", "animated_tiles": True, "background": True, "offscreen_animation": True, "render_scale": 1.0},
+    {"name": "static tiles", "animated_tiles": False, "background": True, "offscreen_animation": True, "render_scale": 1.0},
+    {"name": "plain background", "animated_tiles": False, "background": False, "offscreen_animation": True, "render_scale": 1.0},
+    {"name": "visible animation only", "animated_tiles": False, "background": False, "offscreen_animation": False, "render_scale": 1.0},
+    {"name": "render 75%", "animated_tiles": False, "background": False, "offscreen_animation": False, "render_scale": 0.75},
+    {"name": "render 50%", "animated_tiles": False, "background": False, "offscreen_animation": False, "render_scale": 0.5},
+]
+PROFILER_KEY = pygame.K_F10  # Debug key: toggle the frame-time overlay
+
+class FrameGovernor:
+    def __init__(self, fps=FPS, window=30, recover_frames=120, enabled=True):
+        self.budget_ms = 1000 / fps
+        self.window = window
+        self.recover_frames = recover_frames  # Frames of headroom needed before stepping up
+        self.enabled = enabled
+        self.samples = collections.deque(maxlen=window)
+        self.total = 0.0
+        self.tier = 0
+        self.quality = QUALITY_TIERS[0]
+        self.calm_frames = 0
+        self.changes = 0
+        self.view = None  # Camera rect in map coordinates, set by the game loop
+
+    def record(self, frame_ms):
+        """Adds one frame's work time (excluding the frame limiter's sleep)."""
+        if len(self.samples) == self.window:
+            self.total -= self.samples[0]
+        self.samples.append(frame_ms)
+        self.total += frame_ms
+        if not self.enabled or len(self.samples) < self.window:
+            return
+        average = self.total / len(self.samples)
+        if average > self.budget_ms * 0.95 and self.tier < len(QUALITY_TIERS) - 1:
+            self.set_tier(self.tier + 1)
+        elif average < self.budget_ms * 0.6 and self.tier > 0:
+            self.calm_frames += 1
+            if self.calm_frames >= self.recover_frames:
+                self.set_tier(self.tier - 1)
+        else:
+            self.calm_frames = 0
+
+    def set_tier(self, tier):
+        average = self.average_ms()
+        self.tier = tier
+        self.quality = QUALITY_TIERS[tier]
+        self.changes += 1
+        # Judge the new tier on its own frames only.
+        self.samples.clear()
+        self.total = 0.0
+        self.calm_frames = 0
+        print(f"[Governor] quality tier {tier} ({self.quality['name']}), average frame {average:.1f} ms")
+
+    def average_ms(self):
+        return self.total / len(self.samples) if self.samples else 0.0
+
+    def animates(self, rect):
+        """Whether a sprite at rect should animate this frame."""
+        return self.quality["offscreen_animation"] or self.view is None or self.view.colliderect(rect)
+
+    def state(self):
+        return {"tier": self.tier, "tier_name": self.quality["name"], "frame_ms": self.average_ms(),
+                "budget_ms": self.budget_ms, "changes": self.changes}
+
+governor = FrameGovernor()
+show_profiler = False
 
 # --------------------
 # Global Sprite Groups
@@ -43,59 +292,180 @@ selected_difficulty = "Easy"  # Selected in the main menu
 bullet_group = pygame.sprite.Group()       # For player spells
 boss_projectiles = pygame.sprite.Group()     # For boss attack projectiles
 
+# --------------------
+# Global Timers
+# --------------------
+# One timer wheel for every entity timer and cooldown. It runs on simulation
+# time: game_loop advances it by one tick per frame, so per-frame cost depends
+# on how many timers fire, not on how many entities are alive.
+timers = TimerWheel()
+
+def ms_to_ticks(ms):
+    return max(1, round(ms * FPS / 1000))
+
 # --------------------
 # Image Cache & Loader Functions
 # --------------------
 image_cache = {}
 
-def show_about_screen():
-    about = True
-    font_title = pygame.font.SysFont(None, 60)
-    font_text = pygame.font.SysFont(None, 36)
-    instructions = [
-        "Welcome to I Wanna Be The Guy Tribute!",
-        "",
-        "How to Play:",
-        "  - Use LEFT/RIGHT arrow keys to move.",
-        "  - Press SPACE to jump.",
-        "  - Press F to cast a spell (costs mana).",
-        "  - Collect health and mana pickups.",
-        "  - Avoid obstacles and reach the goal to progress.",
-        "",
-        "Press any key to continue..."
-    ]
-    while about:
-        screen.fill(BLACK)
-        title_surface = font_title.render("How to Play", True, WHITE)
-        screen.blit(title_surface, (WIDTH // 2 - title_surface.get_width() // 2, 50))
-        for i, line in enumerate(instructions):
-            text_surface = font_text.render(line, True, WHITE)
-            screen.blit(text_surface, (50, 150 + i * 40))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN:
-                about = False
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-        clock.tick(FPS)
-
-def load_image(path, w, h):
-    if path in image_cache:
-        return image_cache[path]
+# Pre-scaled raw pixels for every asset (built with asset_bundle.py); loaders
+# try it first and fall back to decoding the source file.
+asset_bundle = open_bundle(os.environ.get("ASSET_BUNDLE", "assets.bundle"))
+
+# Surface modes chosen by load_image from the image's alpha channel.
+# Opaque images skip per-pixel blending entirely, images with only fully
+# transparent/fully opaque pixels use an RLE-accelerated colorkey, and only
+# images with partial transparency keep per-pixel alpha.
+OPAQUE, COLORKEY, ALPHA = "opaque", "colorkey", "alpha"
+COLORKEY_COLOR = (255, 0, 255)
+image_modes = {}  # path -> surface mode, so each asset is only inspected once
+
+def classify_alpha(surface):
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    if alpha.min() == 255:
+        return OPAQUE
+    transparent = alpha == 0
+    if np.all(transparent | (alpha == 255)):
+        # The key color must not appear in any visible pixel.
+        rgb = pygame.surfarray.pixels3d(surface)
+        if not np.any(np.all(rgb == COLORKEY_COLOR, axis=2) & ~transparent):
+            return COLORKEY
+    return ALPHA
+
+def convert_for_mode(surface, mode):
+    if mode == OPAQUE:
+        return surface.convert()
+    if mode == COLORKEY:
+        keyed = surface.convert()
+        transparent = pygame.surfarray.pixels_alpha(surface) == 0
+        pixels = pygame.surfarray.pixels3d(keyed)
+        pixels[transparent] = COLORKEY_COLOR
+        del pixels  # Release the pixel view so the surface can be RLE encoded
+        keyed.set_colorkey(COLORKEY_COLOR, pygame.RLEACCEL)
+        return keyed
+    return surface
+
+def load_image(path, w=None, h=None):
+    """Loads, scales to (w, h) (native size when omitted) and converts an image, cached."""
+    key = (path, w, h)
+    if key in image_cache:
+        return image_cache[key]
+    bundled = asset_bundle.image(path, w, h) if asset_bundle else None
+    if bundled:
+        image, image_modes[path] = bundled
+        image_cache[key] = image
+        return image
     if not os.path.exists(path):
         print(f"Warning: Image file '{path}' not found.")
         return None
     try:
         image = pygame.image.load(path).convert_alpha()
-        image = pygame.transform.scale(image, (w, h))
-        image_cache[path] = image
+        if w is not None:
+            image = pygame.transform.scale(image, (w, h))
+        mode = image_modes.get(path)
+        if mode is None:
+            mode = classify_alpha(image)
+            image_modes[path] = mode
+        image = convert_for_mode(image, mode)
+        image_cache[key] = image
         return image
     except pygame.error as e:
         print(f"Error loading image '{path}': {e}")
         return None
 
+parallax_cache = {}  # (path, size, opaque) -> horizontally tiling strip
+
+def load_parallax_strip(path, size=None, opaque=False):
+    key = (path, size, opaque)
+    if key not in parallax_cache:
+        image = load_image(path, *size) if size else load_image(path)
+        if image and opaque and image.get_flags() & pygame.SRCALPHA:
+            # Far layers with a few soft edge pixels don't need per-pixel blending.
+            # Keep only the opaque copy.
+            image = image.convert()
+            image_cache.pop((path,) + (tuple(size) if size else (None, None)), None)
+        parallax_cache[key] = make_strip(image, WIDTH) if image else None
+    return parallax_cache[key]
+
+# --------------------
+# Animated Images (GIF)
+# --------------------
+# All animations share one clock that the game loop advances once per frame,
+# so every sprite or tile using the same animation shows the same frame and
+# the frame lookup is done once per animation per frame, not per instance.
+class AnimationClock:
+    def __init__(self):
+        self.time = 0  # milliseconds of simulation time
+
+    def tick(self, dt):
+        self.time += dt
+
+animation_clock = AnimationClock()
+
+class AnimatedImage:
+    def __init__(self, frames, durations):
+        self.frames = frames
+        self.end_times = list(itertools.accumulate(durations))
+        self.total = self.end_times[-1]
+        self._time = None
+        self._image = frames[0]
+
+    @property
+    def image(self):
+        now = animation_clock.time
+        if now != self._time and len(self.frames) > 1:
+            self._time = now
+            index = bisect.bisect_right(self.end_times, now % self.total)
+            self._image = self.frames[index]
+        return self._image
+
+animation_cache = {}   # (path, w, h) -> AnimatedImage
+gif_frame_cache = {}   # path -> decoded full-size frames, shared by all sizes
+
+def is_animated(path):
+    return path is not None and path.lower().endswith(".gif")
+
+def load_animation(path, w, h):
+    key = (path, w, h)
+    if key in animation_cache:
+        return animation_cache[key]
+    bundled = asset_bundle.animation(path, w, h) if asset_bundle else None
+    if bundled:
+        frames, delays, image_modes[path] = bundled
+        animation = AnimatedImage(frames, delays)
+        animation_cache[key] = animation
+        return animation
+    if not os.path.exists(path):
+        print(f"Warning: Image file '{path}' not found.")
+        return None
+    try:
+        if path not in gif_frame_cache:
+            decoded = []
+            for rgba, delay in decode_gif(path):
+                frame = pygame.image.frombuffer(rgba.tobytes(), (rgba.shape[1], rgba.shape[0]), "RGBA")
+                decoded.append((frame.convert_alpha(), delay))
+            gif_frame_cache[path] = decoded
+        scaled = [pygame.transform.scale(frame, (w, h)) for frame, _ in gif_frame_cache[path]]
+        # Use one surface mode for every frame: the most general one needed.
+        mode = image_modes.get(path)
+        if mode is None:
+            modes = {classify_alpha(frame) for frame in scaled}
+            mode = next(m for m in (ALPHA, COLORKEY, OPAQUE) if m in modes)
+            image_modes[path] = mode
+        frames = [convert_for_mode(frame, mode) for frame in scaled]
+        animation = AnimatedImage(frames, [delay for _, delay in gif_frame_cache[path]])
+        animation_cache[key] = animation
+        return animation
+    except (pygame.error, ValueError) as e:
+        print(f"Error loading animation '{path}': {e}")
+        return None
+
 def get_image_details(file_path):
+    size = asset_bundle.native_size(file_path) if asset_bundle else None
+    if size:
+        width, height = size  # No need to decode the sheet just for its size
+        print("Image size:", width, "x", height)
+        return width, height
     if not os.path.exists(file_path):
         print(f"File not found: {file_path}")
         sys.exit(1)
@@ -104,30 +474,17 @@ def get_image_details(file_path):
     print("Image size:", width, "x", height)
     return width, height
 
-def slice_sprite_sheet(sheet, sprite_width=32, sprite_height=32, rows=4):
-    sheet_width, sheet_height = sheet.get_size()
-    columns = sheet_width // sprite_width
-    sprites = []
-    for row in range(rows):
-        row_sprites = []
-        for col in range(columns):
-            rect = pygame.Rect(col * sprite_width, row * sprite_height, sprite_width, sprite_height)
-            sprite = sheet.subsurface(rect).copy()
-            row_sprites.append(sprite)
-        sprites.append(row_sprites)
-    return sprites
-
 # --------------------
 # Load and Slice the Sprite Sheet for the Player
 # --------------------
 sprite_image_path = "images/characters.png"  
 sheet_width, sheet_height = get_image_details(sprite_image_path)
 sprite_sheet = load_image(sprite_image_path, sheet_width, sheet_height)
-cols, rows = 23, 4
+cols, rows = detect_sprite_grid(sprite_sheet)
 sprite_width = sheet_width // cols
 sprite_height = sheet_height // rows
 print("Each sprite is:", sprite_width, "x", sprite_height)
-all_sprite_frames = slice_sprite_sheet(sprite_sheet, sprite_width, sprite_height, rows)
+all_sprite_frames = slice_sprite_sheet(sprite_sheet, sprite_width, sprite_height, rows, copy=False)
 player_frames = all_sprite_frames[1]  # Use row 1 for the player
 
 # --------------------
@@ -136,23 +493,132 @@ player_frames = all_sprite_frames[1]  # Use row 1 for the player
 boss_image_path = "images/environment/boss/mage-1-85x94.png"
 boss_sheet_width, boss_sheet_height = get_image_details(boss_image_path)
 boss_sheet = load_image(boss_image_path, boss_sheet_width, boss_sheet_height)
-boss_cols, boss_rows = 4, 2  # Assume 4 columns and 2 rows for the boss sheet
+boss_cols, boss_rows = detect_sprite_grid(boss_sheet)
 boss_width = boss_sheet_width // boss_cols
 boss_height = boss_sheet_height // boss_rows
 print("Each boss sprite is:", boss_width, "x", boss_height)
-all_boss_frames = slice_sprite_sheet(boss_sheet, boss_width, boss_height, boss_rows)
+all_boss_frames = slice_sprite_sheet(boss_sheet, boss_width, boss_height, boss_rows, copy=False)
 boss_frames = all_boss_frames[1]  # Use row 1 for boss animation
 
 # --------------------
 # Utility Function for Tiled Platforms
 # --------------------
+# Each tiled platform keeps a collision grid of these kinds next to its tile
+# codes. Cells with the EMPTY_TILE code (e.g. crumbled or destroyed tiles)
+# are drawn transparent and can be fallen through.
+TILE_SOLID, TILE_TRAP, TILE_EMPTY = "solid", "trap", "empty"
+EMPTY_TILE = None
+DEFAULT_TRAP_TILES = (1,)
+
+def tile_kind_at(tiled_platform, x, y):
+    """Collision kind of the tile at a map point, or None outside the platform's grid."""
+    col = int((x - tiled_platform.rect.left) // tiled_platform.tile_width)
+    row = int((y - tiled_platform.rect.top) // tiled_platform.tile_height)
+    grid = tiled_platform.collision
+    if 0 <= row < len(grid) and 0 <= col < len(grid[0]):
+        return grid[row][col]
+    return None
+
 def check_trap_collision(player, tiled_platform):
-    local_x = player.rect.centerx - tiled_platform.rect.left
-    local_y = player.rect.bottom - tiled_platform.rect.top
-    col = int(local_x // tiled_platform.tile_width)
-    row = int(local_y // tiled_platform.tile_height)
-    if 0 <= row < len(tiled_platform.tile_map) and 0 <= col < len(tiled_platform.tile_map[0]):
-        return tiled_platform.tile_map[row][col] == 1
+    return tile_kind_at(tiled_platform, player.rect.centerx, player.rect.bottom) == TILE_TRAP
+
+# --------------------
+# Pixel-Accurate Collision
+# --------------------
+# Sprites collide on their visible pixels instead of their (often padded)
+# rects. Masks are built once per distinct image and cached; sprites keep
+# stable per-frame and pre-flipped images so the cache is hit every frame.
+# The mask test only runs after a cheap rect overlap.
+PIXEL_COLLISION = True
+mask_cache = weakref.WeakKeyDictionary()  # Surface -> Mask
+
+def get_mask(surface):
+    mask = mask_cache.get(surface)
+    if mask is None:
+        mask = pygame.mask.from_surface(surface)
+        mask_cache[surface] = mask
+    return mask
+
+def sprites_touch(a, b):
+    if not a.rect.colliderect(b.rect):
+        return False
+    if not PIXEL_COLLISION:
+        return True
+    offset = (b.rect.x - a.rect.x, b.rect.y - a.rect.y)
+    return get_mask(a.image).overlap(get_mask(b.image), offset) is not None
+
+# --------------------
+# Swept Collision
+# --------------------
+# Continuous tests so fast movers (or large timesteps) cannot tunnel through
+# thin platforms or small targets between two frames.
+def swept_aabb(rect, dx, dy, target):
+    """
+    Moves rect by (dx, dy) and returns (time_of_impact, normal) for the first
+    contact with target, with time_of_impact in [0, 1], or None if they do
+    not meet (or already overlap at the start).
+    """
+    if dx == 0 and dy == 0:
+        return None
+    if dx > 0:
+        tx_entry = (target.left - rect.right) / dx
+        tx_exit = (target.right - rect.left) / dx
+    elif dx < 0:
+        tx_entry = (target.right - rect.left) / dx
+        tx_exit = (target.left - rect.right) / dx
+    elif rect.right <= target.left or rect.left >= target.right:
+        return None
+    else:
+        tx_entry, tx_exit = -math.inf, math.inf
+    if dy > 0:
+        ty_entry = (target.top - rect.bottom) / dy
+        ty_exit = (target.bottom - rect.top) / dy
+    elif dy < 0:
+        ty_entry = (target.bottom - rect.top) / dy
+        ty_exit = (target.top - rect.bottom) / dy
+    elif rect.bottom <= target.top or rect.top >= target.bottom:
+        return None
+    else:
+        ty_entry, ty_exit = -math.inf, math.inf
+    entry = max(tx_entry, ty_entry)
+    exit_time = min(tx_exit, ty_exit)
+    if entry > exit_time or entry < 0 or entry > 1:
+        return None
+    if tx_entry > ty_entry:
+        normal = (-1 if dx > 0 else 1, 0)
+    else:
+        normal = (0, -1 if dy > 0 else 1)
+    return entry, normal
+
+def projectile_hits(projectile, target):
+    """Pixel test at the current position, or pixel tests sub-stepped over the last move."""
+    if sprites_touch(projectile, target):
+        return True
+    prev = getattr(projectile, "prev_rect", None)
+    if prev is None:
+        return False
+    dx = projectile.rect.x - prev.x
+    dy = projectile.rect.y - prev.y
+    if prev.colliderect(target.rect):
+        start = 0.0
+    else:
+        hit = swept_aabb(prev, dx, dy, target.rect)
+        if hit is None:
+            return False
+        start = hit[0]
+    if not PIXEL_COLLISION:
+        return True
+    # The boxes meet from `start` on; test the masks from there to the current
+    # position in steps no longer than the projectile, so no pixels are skipped.
+    projectile_mask = get_mask(projectile.image)
+    target_mask = get_mask(target.image)
+    step = max(1, min(projectile.rect.width, projectile.rect.height))
+    steps = max(1, math.ceil(max(abs(dx), abs(dy)) * (1 - start) / step))
+    for i in range(steps):  # i == steps is the current position, tested above
+        t = start + (1 - start) * i / steps
+        offset = (round(prev.x + dx * t) - target.rect.x, round(prev.y + dy * t) - target.rect.y)
+        if target_mask.overlap(projectile_mask, offset) is not None:
+            return True
     return False
 
 # --------------------
@@ -163,9 +629,11 @@ class Player(pygame.sprite.Sprite):
         super().__init__()
         if frames:
             self.frames = frames
+            # Flipped once up front so each facing has stable images (and masks).
+            self.flipped_frames = [pygame.transform.flip(frame, True, False) for frame in frames]
             self.current_frame = 0
             self.frame_duration = frame_duration  # milliseconds per frame
-            self.last_update = pygame.time.get_ticks()
+            self.anim_ms = 0  # Simulation time since the last frame change
             self.image = self.frames[self.current_frame]
         else:
             self.image = pygame.Surface((80, 120))
@@ -178,35 +646,69 @@ class Player(pygame.sprite.Sprite):
         self.facing = 1
         self.health = 100
         self.mana = 100
-        self.damage_cooldown = 0
+        self.damage_cooldown = 0  # Non-zero while invulnerable after a hit
+        self.cooldown_timer = None
+        self.last_damage = None  # "trap", "obstacle" or "boss_projectile", for telemetry
 
-    def update(self, platforms):
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT]:
+    def update(self, platforms, dt=1.0, controls=None):
+        """controls: optional (left, right, down) flags; defaults to the keyboard."""
+        if controls is None:
+            keys = pygame.key.get_pressed()
+            controls = (keys[pygame.K_LEFT], keys[pygame.K_RIGHT], keys[pygame.K_DOWN])
+        left, right, down = controls
+        if left:
             self.facing = -1
-            self.rect.x -= self.speed
-        if keys[pygame.K_RIGHT]:
+            self.rect.x -= self.speed * dt
+        if right:
             self.facing = 1
-            self.rect.x += self.speed
+            self.rect.x += self.speed * dt
 
-        self.vel_y += 0.8
-        self.rect.y += self.vel_y
+        self.vel_y = min(self.vel_y + GRAVITY * dt, MAX_FALL_SPEED)
+        start_y = self.rect.y
+        self.rect.y += self.vel_y * dt
 
         self.on_ground = False
+        # Platforms the player passed straight through this step: (time, platform)
+        swept_hits = []
         # Loop through platforms and check for collisions.
         # Allow drop-through on non-base platforms if DOWN key is pressed.
         for plat in platforms:
-            if keys[pygame.K_DOWN] and not isinstance(plat, TiledBasePlatform):
+            if down and not isinstance(plat, TiledBasePlatform):
                 continue  # Skip collision with non-base platforms when DOWN is pressed
-            if self.rect.colliderect(plat.rect) and self.vel_y >= 0:
+            if self.vel_y < 0:
+                continue
+            if self.rect.colliderect(plat.rect):
                 if isinstance(plat, TiledBasePlatform):
+                    if tile_kind_at(plat, self.rect.centerx, plat.rect.top) == TILE_EMPTY:
+                        continue  # Falling through a hole in the ground
                     if check_trap_collision(self, plat):
                         self.health = 0
+                        self.last_damage = "trap"
                         print("Stepped on a trap tile!")
                         continue
                 self.rect.bottom = plat.rect.top
                 self.vel_y = 0
                 self.on_ground = True
+            elif not self.on_ground:
+                start = self.rect.move(0, start_y - self.rect.y)
+                hit = swept_aabb(start, 0, self.rect.y - start_y, plat.rect)
+                if hit and hit[1] == (0, -1):
+                    if isinstance(plat, TiledBasePlatform) and \
+                            tile_kind_at(plat, self.rect.centerx, plat.rect.top) == TILE_EMPTY:
+                        continue
+                    swept_hits.append((hit[0], plat))
+
+        if swept_hits and not self.on_ground:
+            # Land on the first platform crossed during the step.
+            _, plat = min(swept_hits, key=lambda item: item[0])
+            self.rect.bottom = plat.rect.top
+            if isinstance(plat, TiledBasePlatform) and check_trap_collision(self, plat):
+                self.health = 0
+                self.last_damage = "trap"
+                print("Stepped on a trap tile!")
+            else:
+                self.vel_y = 0
+                self.on_ground = True
 
         if self.rect.left < 0:
             self.rect.left = 0
@@ -215,21 +717,33 @@ class Player(pygame.sprite.Sprite):
         if self.rect.top > MAP_HEIGHT:
             self.rect.topleft = (50, MAP_HEIGHT - 100)
             self.vel_y = 0
-        if self.damage_cooldown > 0:
-            self.damage_cooldown -= 1
 
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.frame_duration:
-            self.last_update = now
+        # Animation runs on simulation time, not the wall clock, so seeded
+        # runs pick the same frames (and collision masks) on any machine.
+        self.anim_ms += dt * 1000 / FPS
+        if self.anim_ms >= self.frame_duration:
+            self.anim_ms %= self.frame_duration
             self.current_frame = (self.current_frame + 1) % len(self.frames)
-            self.image = self.frames[self.current_frame]
             if self.facing == -1:
-                self.image = pygame.transform.flip(self.image, True, False)
+                self.image = self.flipped_frames[self.current_frame]
+            else:
+                self.image = self.frames[self.current_frame]
 
     def jump(self):
         if self.on_ground:
             self.vel_y = self.jump_strength
 
+    def start_damage_cooldown(self, ticks):
+        self.clear_damage_cooldown()
+        self.damage_cooldown = ticks
+        self.cooldown_timer = timers.schedule(ticks, self.clear_damage_cooldown)
+
+    def clear_damage_cooldown(self):
+        if self.cooldown_timer:
+            self.cooldown_timer.cancel()
+            self.cooldown_timer = None
+        self.damage_cooldown = 0
+
 # --------------------
 # Platform Classes
 # --------------------
@@ -254,9 +768,9 @@ class MovingPlatform(Platform):
         else:
             self.boundaries = tuple(boundaries)
 
-    def update(self):
-        self.rect.x += self.direction.x * self.speed
-        self.rect.y += self.direction.y * self.speed
+    def update(self, dt=1.0):
+        self.rect.x += self.direction.x * self.speed * dt
+        self.rect.y += self.direction.y * self.speed * dt
         if self.rect.left <= self.boundaries[0] or self.rect.right >= self.boundaries[1]:
             self.direction.x *= -1
             print(f"[DEBUG] MovingPlatform at {self.rect.topleft} reversed horizontal direction; new direction: {self.direction}")
@@ -265,37 +779,73 @@ class MovingPlatform(Platform):
             print(f"[DEBUG] MovingPlatform at {self.rect.topleft} reversed vertical direction; new direction: {self.direction}")
 
 class TiledBasePlatform(pygame.sprite.Sprite):
-    def __init__(self, x, y, tile_map, tile_width, tile_height, tile_images=None):
+    def __init__(self, x, y, tile_map, tile_width, tile_height, tile_images=None, trap_tiles=DEFAULT_TRAP_TILES):
         super().__init__()
-        self.tile_map = tile_map
         self.tile_width = tile_width
         self.tile_height = tile_height
-        rows = len(tile_map)
-        cols = len(tile_map[0]) if rows > 0 else 0
-        width = cols * tile_width
-        height = rows * tile_height
-        self.image = pygame.Surface((width, height), pygame.SRCALPHA)
-        self.rect = self.image.get_rect(topleft=(x, y))
         if tile_images is None:
             tile_images = {
                 0: "images/base_platform_tile.png",
                 1: "images/base_platform_trap.png"
             }
         self.tile_images = {}
+        self.animated_tiles = {}
         for tile_type, path in tile_images.items():
-            img = load_image(path, tile_width, tile_height)
+            img = None
+            if is_animated(path):
+                animation = load_animation(path, tile_width, tile_height)
+                if animation:
+                    self.animated_tiles[tile_type] = animation
+                    img = animation.image
+            else:
+                img = load_image(path, tile_width, tile_height)
             if img is None:
                 fallback = pygame.Surface((tile_width, tile_height))
                 fallback.fill(GREEN if tile_type == 0 else RED)
                 self.tile_images[tile_type] = fallback
             else:
                 self.tile_images[tile_type] = img
-        for r in range(rows):
-            for c in range(cols):
-                tile_type = tile_map[r][c]
-                tile_img = self.tile_images.get(tile_type)
-                if tile_img:
-                    self.image.blit(tile_img, (c * tile_width, r * tile_height))
+        # The tiles are baked once into a single surface; see tilemap.py.
+        self.tiles = TileMap(tile_map, tile_width, tile_height, self.tile_images)
+        self.tile_map = self.tiles.tiles
+        self.image = self.tiles.surface
+        self.rect = self.image.get_rect(topleft=(x, y))
+        self.trap_tiles = frozenset(trap_tiles)
+        self.collision = [[self.tile_kind(code) for code in row] for row in self.tile_map]
+
+    def tile_kind(self, tile_code):
+        if tile_code == EMPTY_TILE:
+            return TILE_EMPTY
+        return TILE_TRAP if tile_code in self.trap_tiles else TILE_SOLID
+
+    def tile_at(self, x, y):
+        """(row, col) of the tile at a map point, or None."""
+        return self.tiles.cell_at(x - self.rect.x, y - self.rect.y)
+
+    def set_tile(self, row, col, tile_code):
+        """
+        Changes one tile at runtime (crumbling ground, a trap switching on, a
+        tile destroyed by a spell). Updates the collision grid and re-bakes only
+        that cell; the renderer picks the change up through the TileMap's
+        change log. Returns the dirty Rect in map coordinates, or None if the
+        tile already had that code.
+        """
+        rect = self.tiles.set_tile(row, col, tile_code)
+        if rect is None:
+            return None
+        self.collision[row][col] = self.tile_kind(tile_code)
+        return rect.move(self.rect.topleft)
+
+    def update(self, dt=1.0):
+        # Animated tiles only re-bake their own cells, and only on frames
+        # where the shared animation actually changes image.
+        if not governor.quality["animated_tiles"] or not governor.animates(self.rect):
+            return
+        for tile_type, animation in self.animated_tiles.items():
+            frame = animation.image
+            if frame is not self.tile_images[tile_type]:
+                self.tile_images[tile_type] = frame
+                self.tiles.set_tile_image(tile_type, frame)
 
 # --------------------
 # Obstacle Class (with Dynamic Behavior)
@@ -313,27 +863,35 @@ class Obstacle(pygame.sprite.Sprite):
         self.speed = speed
         self.vertical = False  # default horizontal movement
         self.dynamic = dynamic
-        self.timer = 0
-
-    def update(self):
-        if self.dynamic:
-            self.timer += 1
-            if self.timer >= 60:
-                old_speed = self.speed
-                multiplier = random.uniform(0.5, 1.5)
-                if random.choice([True, False]):
-                    self.speed = -abs(self.speed) * multiplier
-                else:
-                    self.speed = abs(self.speed) * multiplier
-                print(f"[DEBUG] Obstacle at {self.rect.topleft} changed speed: {old_speed:.2f} -> {self.speed:.2f}")
-                self.timer = 0
+        # Dynamic obstacles re-randomise their speed every 60 frames.
+        self.speed_timer = timers.schedule_repeating(60, self.change_speed) if dynamic else None
+        self.engine = None  # Set when an ObstacleEngine takes over this obstacle's motion
+
+    def change_speed(self):
+        old_speed = self.speed
+        multiplier = random.uniform(0.5, 1.5)
+        if random.choice([True, False]):
+            self.speed = -abs(self.speed) * multiplier
+        else:
+            self.speed = abs(self.speed) * multiplier
+        print(f"[DEBUG] Obstacle at {self.rect.topleft} changed speed: {old_speed:.2f} -> {self.speed:.2f}")
+
+    def kill(self):
+        if self.speed_timer:
+            self.speed_timer.cancel()
+            self.speed_timer = None
+        if self.engine:
+            self.engine.remove(self)
+        super().kill()
+
+    def update(self, dt=1.0):
         if self.vertical:
-            self.rect.y += self.speed
+            self.rect.y += self.speed * dt
             if self.rect.top <= 0 or self.rect.bottom >= MAP_HEIGHT:
                 self.speed = -self.speed
                 print(f"[DEBUG] Vertical obstacle at {self.rect.topleft} bounced; new speed: {self.speed:.2f}")
         else:
-            self.rect.x += self.speed
+            self.rect.x += self.speed * dt
             if self.rect.left <= 0 or self.rect.right >= MAP_WIDTH:
                 self.speed = -self.speed
                 print(f"[DEBUG] Horizontal obstacle at {self.rect.topleft} bounced; new speed: {self.speed:.2f}")
@@ -361,7 +919,11 @@ class Pickup(pygame.sprite.Sprite):
 class Bullet(pygame.sprite.Sprite):
     def __init__(self, x, y, direction=1, image_path="images/environment/spells/fire_ball_spell.png", width=50, height=50, velocity=None):
         super().__init__()
-        self.image = load_image(image_path, width, height)
+        self.animation = load_animation(image_path, width, height) if is_animated(image_path) else None
+        if self.animation:
+            self.image = self.animation.image
+        else:
+            self.image = load_image(image_path, width, height)
         if self.image is None:
             self.image = pygame.Surface((width, height))
             self.image.fill(YELLOW)
@@ -372,13 +934,66 @@ class Bullet(pygame.sprite.Sprite):
             self.vx = 10 * direction
             self.vy = 0
 
-    def update(self):
-        self.rect.x += self.vx
-        self.rect.y += self.vy
+    def update(self, dt=1.0):
+        if self.animation and governor.animates(self.rect):
+            self.image = self.animation.image
+        self.prev_rect = self.rect.copy()  # For swept hit tests
+        self.rect.x += self.vx * dt
+        self.rect.y += self.vy * dt
         if (self.rect.right < 0 or self.rect.left > MAP_WIDTH or 
             self.rect.bottom < 0 or self.rect.top > MAP_HEIGHT):
             self.kill()
 
+# --------------------
+# Projectile Pool
+# --------------------
+# Boss projectiles are recycled rather than created per volley: a killed
+# PooledBullet goes back to its pool and a later volley relaunches it.
+class PooledBullet(Bullet):
+    def __init__(self, pool):
+        super().__init__(0, 0, image_path=pool.image_path, width=pool.size, height=pool.size, velocity=(0, 0))
+        self.pool = pool
+        self.serial = 0  # Bumped on every launch, so stale burst timers can tell
+
+    def launch(self, x, y, vx, vy):
+        self.serial += 1
+        self.rect.center = (x, y)
+        self.prev_rect = self.rect.copy()
+        self.vx, self.vy = vx, vy
+
+    def kill(self):
+        if self.alive():
+            super().kill()
+            self.pool.free.append(self)
+
+class BulletPool:
+    def __init__(self, image_path, size):
+        self.image_path = image_path
+        self.size = size
+        self.free = []
+
+    def reserve(self, count):
+        while len(self.free) < count:
+            self.free.append(PooledBullet(self))
+
+    def acquire(self, x, y, vx, vy):
+        bullet = self.free.pop() if self.free else PooledBullet(self)
+        bullet.launch(x, y, vx, vy)
+        return bullet
+
+bullet_pools = {}  # (image_path, size) -> BulletPool
+
+def get_bullet_pool(image_path, size):
+    key = (image_path, size)
+    if key not in bullet_pools:
+        bullet_pools[key] = BulletPool(image_path, size)
+    return bullet_pools[key]
+
+def clear_boss_projectiles():
+    """Removes every boss projectile, returning pooled ones to their pool (Group.empty() would orphan them)."""
+    for bullet in boss_projectiles.sprites():
+        bullet.kill()
+
 # --------------------
 # Boss Classes
 # --------------------
@@ -387,23 +1002,39 @@ class SmallBoss(Obstacle):
     def __init__(self, x, y, w, h, speed, image_path=None, dynamic=False):
         super().__init__(x, y, w, h, speed, image_path, dynamic)
         self.original_image = self.image.copy()
-    def update(self):
-        super().update()
+        self.flipped_image = pygame.transform.flip(self.original_image, True, False)
+    def face_movement(self):
         if not self.vertical:
-            if self.speed < 0:
-                self.image = pygame.transform.flip(self.original_image, True, False)
-            else:
-                self.image = self.original_image.copy()
+            self.image = self.flipped_image if self.speed < 0 else self.original_image
+    def update(self, dt=1.0):
+        super().update(dt)
+        self.face_movement()
+
+# Attack interval (ms) for each boss phase.
+BOSS_PHASE_INTERVALS = {1: 2000, 2: 1500, 3: 1000}
+
+# Attack script for bosses whose level config has no "attacks" (see
+# bullet_patterns.py): one shot down, two diagonals, then a 12-way ring.
+DEFAULT_BOSS_ATTACKS = {
+    1: [{"type": "ring", "count": 1, "angle": 90, "speed": 10, "origin": "bottom"}],
+    2: [{"type": "ring", "count": 2, "angle": 90, "arc": 90, "speed": 7 * math.sqrt(2), "origin": "bottom"}],
+    3: [{"type": "ring", "count": 12, "speed": 10, "image": "images/environment/spells/fire_ball_spell.png"}],
+}
+default_boss_attacks = compile_attacks(DEFAULT_BOSS_ATTACKS)
+aim_target = None  # The player's rect, for aimed patterns; set every frame by simulate_frame
 
 # Big Boss – uses a list of frames for animation, has phases, moves randomly in the map,
 # and attacks by spawning projectiles into the global boss_projectiles group.
 class Boss(pygame.sprite.Sprite):
-    def __init__(self, x, y, w, h, speed, frames, dynamic=False, boundaries=(300,700)):
+    def __init__(self, x, y, w, h, speed, frames, dynamic=False, boundaries=(300,700), attacks=None):
         super().__init__()
+        self.attacks = attacks or default_boss_attacks  # Compiled: phase -> [Emitter]
         # Scale each frame to (w, h)
         self.frames = [pygame.transform.scale(frame, (w, h)) for frame in frames]
+        self.flipped_frames = [pygame.transform.flip(frame, True, False) for frame in self.frames]
         self.current_frame = 0
         self.frame_duration = 100  # milliseconds per frame
+        self.anim_ms = 0  # Simulation time since the last frame change
         self.image = self.frames[self.current_frame]
         self.rect = self.image.get_rect(topleft=(x, y))
         # Instead of a fixed speed, we use separate vx and vy for random movement.
@@ -411,29 +1042,43 @@ class Boss(pygame.sprite.Sprite):
         self.vy = 0
         self.dynamic = dynamic
         self.vertical = False
-        self.timer = 0
-        self.attack_timer = 0
-        self.move_timer = 0
         self.phase = 1
         self.max_health = 200
         self.health = self.max_health
-        self.attack_interval = 2000  # ms for phase 1
+        self.attack_interval = BOSS_PHASE_INTERVALS[1]
+        self.phase_started = pygame.time.get_ticks()
+        self.phase_times = []  # (phase, ms) of every finished phase, for telemetry
         self.boundaries = boundaries  # horizontal movement range for fallback if needed
-        self.last_time = pygame.time.get_ticks()
-    def update(self):
+        # Randomize movement every 1000 ms and attack every attack_interval ms.
+        self.move_timer = timers.schedule_repeating(ms_to_ticks(1000), self.change_direction)
+        self.attack_timer = timers.schedule_repeating(ms_to_ticks(self.attack_interval), self.attack)
+    def change_direction(self):
+        self.vx = random.choice([-1, 1]) * random.uniform(1, 3)
+        self.vy = random.choice([-1, 1]) * random.uniform(1, 3)
+    def set_attack_interval(self, ms):
+        self.attack_interval = ms
+        self.attack_timer.cancel()
+        self.attack_timer = timers.schedule_repeating(ms_to_ticks(ms), self.attack)
+    def set_phase(self, phase, record=True):
+        """record=False sets the starting phase from a level config without timing phase 1."""
+        if not record:
+            self.phase_started = pygame.time.get_ticks()
+        elif phase != self.phase:
+            self.end_phase()
+        self.phase = phase
+        self.set_attack_interval(BOSS_PHASE_INTERVALS[phase])
+    def end_phase(self):
+        """Closes the timing of the current phase (on a phase change or defeat)."""
         now = pygame.time.get_ticks()
-        delta = now - self.last_time
-        self.last_time = now
-
-        # Randomize movement every 1000 ms
-        self.move_timer += delta
-        if self.move_timer >= 1000:
-            self.vx = random.choice([-1, 1]) * random.uniform(1, 3)
-            self.vy = random.choice([-1, 1]) * random.uniform(1, 3)
-            self.move_timer = 0
-
-        self.rect.x += self.vx
-        self.rect.y += self.vy
+        self.phase_times.append((self.phase, now - self.phase_started))
+        self.phase_started = now
+    def kill(self):
+        self.move_timer.cancel()
+        self.attack_timer.cancel()
+        super().kill()
+    def update(self, dt=1.0):
+        self.rect.x += self.vx * dt
+        self.rect.y += self.vy * dt
 
         # Constrain boss within the map boundaries
         if self.rect.left < 0:
@@ -451,98 +1096,187 @@ class Boss(pygame.sprite.Sprite):
 
         # Phase transitions based on health thresholds
         if self.health < self.max_health * 0.5 and self.phase == 1:
-            self.phase = 2
-            self.attack_interval = 1500
+            self.set_phase(2)
             print("Boss leveled up to Phase 2!")
         elif self.health < self.max_health * 0.25 and self.phase == 2:
-            self.phase = 3
-            self.attack_interval = 1000
+            self.set_phase(3)
             print("Boss leveled up to Phase 3!")
 
-        self.attack_timer += delta
-        if self.attack_timer >= self.attack_interval:
-            self.attack_timer = 0
-            self.attack()
-
-        # Update animation
-        if delta > self.frame_duration:
+        # Update animation (on simulation time, like Player)
+        self.anim_ms += dt * 1000 / FPS
+        if self.anim_ms >= self.frame_duration and governor.animates(self.rect):
+            self.anim_ms %= self.frame_duration
             self.current_frame = (self.current_frame + 1) % len(self.frames)
-            self.image = self.frames[self.current_frame]
             if self.vx < 0:
-                self.image = pygame.transform.flip(self.image, True, False)
+                self.image = self.flipped_frames[self.current_frame]
+            else:
+                self.image = self.frames[self.current_frame]
     def attack(self):
         print(f"Boss attacking in Phase {self.phase}!")
-        # Advanced attack pattern:
-        if self.phase == 1:
-            # Shoot one bullet straight downward
-            new_bullet = Bullet(self.rect.centerx, self.rect.bottom, velocity=(0, 10),
-                                  image_path="images/environment/spells/bluefire.gif", width=40, height=40)
-            boss_projectiles.add(new_bullet)
-        elif self.phase == 2:
-            # Shoot two bullets diagonally downward
-            new_bullet1 = Bullet(self.rect.centerx, self.rect.bottom, velocity=(-7, 7),
-                                  image_path="images/environment/spells/bluefire.gif", width=40, height=40)
-            new_bullet2 = Bullet(self.rect.centerx, self.rect.bottom, velocity=(7, 7),
-                                  image_path="images/environment/spells/bluefire.gif", width=40, height=40)
-            boss_projectiles.add(new_bullet1)
-            boss_projectiles.add(new_bullet2)
-        elif self.phase == 3:
-            # 360-degree attack: fire 12 bullets in all directions
-            num_bullets = 12
-            bullet_speed = 10
-            for i in range(num_bullets):
-                angle_deg = i * (360 / num_bullets)
-                angle_rad = math.radians(angle_deg)
-                vx = bullet_speed * math.cos(angle_rad)
-                vy = bullet_speed * math.sin(angle_rad)
-                new_bullet = Bullet(self.rect.centerx, self.rect.centery, velocity=(vx, vy),
-                                      image_path="images/environment/spells/fire_ball_spell.png", width=40, height=40)
-                boss_projectiles.add(new_bullet)
-    def draw_health_bar(self, surface, camera_offset):
+        for emitter in self.attacks.get(self.phase, ()):
+            fire_emitter(emitter, self)
+    def draw_health_bar(self, target, camera_offset):
+        target = as_render_target(target)
         bar_width = self.rect.width
         bar_height = 5
         health_ratio = self.health / self.max_health
         health_bar_width = int(bar_width * health_ratio)
         bar_x = self.rect.x - camera_offset[0]
         bar_y = self.rect.y - 10 - camera_offset[1]
-        pygame.draw.rect(surface, RED, (bar_x, bar_y, bar_width, bar_height))
-        pygame.draw.rect(surface, GREEN, (bar_x, bar_y, health_bar_width, bar_height))
+        target.draw_rect(RED, (bar_x, bar_y, bar_width, bar_height))
+        target.draw_rect(GREEN, (bar_x, bar_y, health_bar_width, bar_height))
+
+def fire_emitter(emitter, origin):
+    """origin: a Boss (volleys leave from wherever it is by then) or an (x, y) point."""
+    for volley in emitter.volleys:
+        if volley.delay:
+            timers.schedule(ms_to_ticks(volley.delay), emit_volley, emitter, volley, origin)
+        else:
+            emit_volley(emitter, volley, origin)
+
+def emit_volley(emitter, volley, origin):
+    if isinstance(origin, Boss):
+        if not origin.alive():
+            return
+        x = origin.rect.centerx
+        y = origin.rect.bottom if emitter.origin == "bottom" else origin.rect.centery
+    else:
+        x, y = origin
+    velocities = volley.velocities
+    if emitter.aimed and aim_target is not None:
+        # Rotate the precomputed fan (which points along +x) towards the player.
+        dx, dy = aim_target.centerx - x, aim_target.centery - y
+        distance = math.hypot(dx, dy) or 1
+        ux, uy = dx / distance, dy / distance
+        velocities = [(vx * ux - vy * uy, vx * uy + vy * ux) for vx, vy in velocities]
+    pool = get_bullet_pool(emitter.image, emitter.size)
+    audio.play("boss_attack")
+    for vx, vy in velocities:
+        bullet = pool.acquire(x, y, vx, vy)
+        boss_projectiles.add(bullet)
+        if emitter.burst:
+            after, sub_emitter = emitter.burst
+            timers.schedule(ms_to_ticks(after), burst_bullet, bullet, bullet.serial, sub_emitter)
+
+def burst_bullet(bullet, serial, emitter):
+    # Skip bullets that were killed (and maybe relaunched) since they were fired.
+    if bullet.alive() and bullet.serial == serial:
+        center = bullet.rect.center
+        bullet.kill()
+        fire_emitter(emitter, center)
+
+def reserve_bullets(attacks):
+    """Pre-allocates pooled bullets for roughly two attacks of every phase."""
+    def reserve(emitter, count):
+        get_bullet_pool(emitter.image, emitter.size).reserve(count)
+        if emitter.burst:
+            reserve(emitter.burst[1], count * emitter.burst[1].bullets)
+    for emitters in attacks.values():
+        for emitter in emitters:
+            reserve(emitter, emitter.bullets * 2)
 
 # --------------------
-# TiledBasePlatform Class
+# Obstacle Engine (struct-of-arrays)
 # --------------------
-class TiledBasePlatform(pygame.sprite.Sprite):
-    def __init__(self, x, y, tile_map, tile_width, tile_height, tile_images=None):
-        super().__init__()
-        self.tile_map = tile_map
-        self.tile_width = tile_width
-        self.tile_height = tile_height
-        rows = len(tile_map)
-        cols = len(tile_map[0]) if rows > 0 else 0
-        width = cols * tile_width
-        height = rows * tile_height
-        self.image = pygame.Surface((width, height), pygame.SRCALPHA)
-        self.rect = self.image.get_rect(topleft=(x, y))
-        if tile_images is None:
-            tile_images = {
-                0: "images/base_platform_tile.png",
-                1: "images/base_platform_trap.png"
-            }
-        self.tile_images = {}
-        for tile_type, path in tile_images.items():
-            img = load_image(path, tile_width, tile_height)
-            if img is None:
-                fallback = pygame.Surface((tile_width, tile_height))
-                fallback.fill(GREEN if tile_type == 0 else RED)
-                self.tile_images[tile_type] = fallback
-            else:
-                self.tile_images[tile_type] = img
-        for r in range(rows):
-            for c in range(cols):
-                tile_type = tile_map[r][c]
-                tile_img = self.tile_images.get(tile_type)
-                if tile_img:
-                    self.image.blit(tile_img, (c * tile_width, r * tile_height))
+# Optional replacement for per-sprite Obstacle.update: every obstacle of a
+# level is stored as NumPy arrays and moved, bounced and re-randomised in one
+# vectorized step. Sprite rects are only synced for obstacles that are drawn;
+# collision queries run on the arrays directly. Enabled per level with
+# "obstacle_engine": True in its config.
+class ObstacleEngine:
+    def __init__(self, obstacles, seed=None):
+        self.sprites = list(obstacles)
+        n = len(self.sprites)
+        self.x = np.array([o.rect.x for o in self.sprites], dtype=np.float64)
+        self.y = np.array([o.rect.y for o in self.sprites], dtype=np.float64)
+        self.w = np.array([o.rect.width for o in self.sprites], dtype=np.float64)
+        self.h = np.array([o.rect.height for o in self.sprites], dtype=np.float64)
+        self.speed = np.array([o.speed for o in self.sprites], dtype=np.float64)
+        self.vertical = np.array([o.vertical for o in self.sprites], dtype=bool)
+        self.dynamic = np.array([o.dynamic for o in self.sprites], dtype=bool)
+        self.countdown = np.full(n, 60.0)  # frames to next speed change
+        self.alive = np.ones(n, dtype=bool)
+        self.flips = np.array([isinstance(o, SmallBoss) for o in self.sprites], dtype=bool)
+        if seed is None:
+            seed = random.getrandbits(32)  # Follows random.seed() for reproducible runs
+        self.rng = np.random.default_rng(seed)
+        for index, obstacle in enumerate(self.sprites):
+            # The engine owns the speed changes now, not the timer wheel.
+            if obstacle.speed_timer:
+                obstacle.speed_timer.cancel()
+                obstacle.speed_timer = None
+            obstacle.engine = self
+            obstacle.engine_index = index
+
+    def remove(self, obstacle):
+        self.alive[obstacle.engine_index] = False
+
+    def add(self, obstacle):
+        """Appends one obstacle (level editor); the arrays are regrown, so not for per-frame use."""
+        self.sprites.append(obstacle)
+        self.x = np.append(self.x, obstacle.rect.x)
+        self.y = np.append(self.y, obstacle.rect.y)
+        self.w = np.append(self.w, obstacle.rect.width)
+        self.h = np.append(self.h, obstacle.rect.height)
+        self.speed = np.append(self.speed, obstacle.speed)
+        self.vertical = np.append(self.vertical, obstacle.vertical)
+        self.dynamic = np.append(self.dynamic, obstacle.dynamic)
+        self.countdown = np.append(self.countdown, 60.0)
+        self.alive = np.append(self.alive, True)
+        self.flips = np.append(self.flips, isinstance(obstacle, SmallBoss))
+        if obstacle.speed_timer:
+            obstacle.speed_timer.cancel()
+            obstacle.speed_timer = None
+        obstacle.engine = self
+        obstacle.engine_index = len(self.sprites) - 1
+
+    def place(self, obstacle):
+        """Copies a sprite's rect (e.g. dragged in the editor) back into the arrays."""
+        i = obstacle.engine_index
+        self.x[i], self.y[i] = obstacle.rect.x, obstacle.rect.y
+        self.w[i], self.h[i] = obstacle.rect.width, obstacle.rect.height
+
+    def step(self, dt=1.0):
+        dynamic = self.dynamic & self.alive
+        self.countdown[dynamic] -= dt
+        due = dynamic & (self.countdown <= 0)
+        count = int(due.sum())
+        if count:
+            multiplier = self.rng.uniform(0.5, 1.5, count)
+            sign = np.where(self.rng.random(count) < 0.5, -1.0, 1.0)
+            self.speed[due] = sign * np.abs(self.speed[due]) * multiplier
+            self.countdown[due] = 60
+
+        vertical = self.vertical & self.alive
+        horizontal = ~self.vertical & self.alive
+        self.x += np.where(horizontal, self.speed * dt, 0.0)
+        self.y += np.where(vertical, self.speed * dt, 0.0)
+        bounce = (horizontal & ((self.x <= 0) | (self.x + self.w >= MAP_WIDTH))) | \
+                 (vertical & ((self.y <= 0) | (self.y + self.h >= MAP_HEIGHT)))
+        self.speed[bounce] = -self.speed[bounce]
+
+    def overlapping(self, rect):
+        """Indices of live obstacles whose box overlaps rect (a pygame.Rect)."""
+        hit = self.alive & (self.x < rect.right) & (self.x + self.w > rect.left) & \
+              (self.y < rect.bottom) & (self.y + self.h > rect.top)
+        return np.flatnonzero(hit)
+
+    def _sync_sprite(self, i):
+        sprite = self.sprites[i]
+        sprite.rect.x = int(self.x[i])
+        sprite.rect.y = int(self.y[i])
+        sprite.speed = float(self.speed[i])
+        if self.flips[i]:
+            sprite.face_movement()
+        return sprite
+
+    def query(self, rect):
+        # Hits are synced so their rect and image are current for mask tests.
+        return [self._sync_sprite(i) for i in self.overlapping(rect)]
+
+    def sync(self, view_rect):
+        """Copies array state onto the sprites inside view_rect and returns them."""
+        return [self._sync_sprite(i) for i in self.overlapping(view_rect)]
 
 # --------------------
 # Utility Functions
@@ -551,14 +1285,78 @@ def reset_game(player):
     print("Game Over! Restarting from the beginning...")
     player.health = 100
     player.mana = 100  # Reset mana to full
-    player.damage_cooldown = 0
+    player.clear_damage_cooldown()
     player.rect.topleft = (50, MAP_HEIGHT - 100)
     player.vel_y = 0
     return 0
 
+def track(kind, **fields):
+    """Queues a telemetry record (see telemetry.py); does nothing when telemetry is off."""
+    if telemetry:
+        telemetry.record(kind, **fields)
+
+def track_level_end(kind, level_number, started, spells, pickups, bosses, **fields):
+    """Records how a level attempt ended, with its counters and the boss phases finished in it."""
+    if not telemetry:
+        return
+    for boss in bosses:
+        for phase, ms in boss.phase_times:
+            telemetry.record("boss_phase", level=level_number, phase=phase, ms=ms)
+        boss.phase_times.clear()
+    telemetry.record(kind, level=level_number, ms=pygame.time.get_ticks() - started,
+                     spells=spells, pickups=dict(pickups), **fields)
+
 def draw_sprite_group(group, screen, camera_offset):
-    for sprite in group:
-        screen.blit(sprite.image, (sprite.rect.x - camera_offset[0], sprite.rect.y - camera_offset[1]))
+    target = as_render_target(screen)
+    target.blits([(sprite.image, (sprite.rect.x - camera_offset[0], sprite.rect.y - camera_offset[1]))
+                  for sprite in group])
+
+hud_font = None
+
+def hud_text(text):
+    # One font for the HUD, created on first use instead of every frame.
+    global hud_font
+    if hud_font is None:
+        hud_font = pygame.font.SysFont(None, 36)
+    return hud_font.render(text, True, WHITE)
+
+_mana_text = (None, None)  # (mana, rendered text); only re-rendered when mana changes
+
+def draw_hud(target, player, level, camera_offset):
+    global _mana_text
+    # Draw Player Health Bar
+    bar_width = 200
+    bar_height = 20
+    health_percentage = player.health / 100
+    current_bar_width = int(bar_width * health_percentage)
+    target.draw_rect(RED, (20, 20, bar_width, bar_height))
+    target.draw_rect(GREEN, (20, 20, current_bar_width, bar_height))
+    # Draw Player Mana Bar
+    mana_bar_width = 200
+    mana_bar_height = 20
+    mana_percentage = player.mana / 100
+    current_mana_width = int(mana_bar_width * mana_percentage)
+    target.draw_rect((0, 0, 100), (20, 50, mana_bar_width, mana_bar_height))
+    target.draw_rect((0, 0, 255), (20, 50, current_mana_width, mana_bar_height))
+    if _mana_text[0] != player.mana:
+        _mana_text = (player.mana, hud_text(f"Mana: {player.mana}"))
+    mana_text = _mana_text[1]
+    target.blit(mana_text, (WIDTH - mana_text.get_width() - 20, 50))
+    # Draw Boss Health Bar for any Boss in the level
+    for obstacle in level.sprite_obstacles:
+        if isinstance(obstacle, Boss):
+            obstacle.draw_health_bar(target, camera_offset)
+
+_profiler_text = (None, None)
+
+def draw_profiler(target):
+    # Frame-time overlay (F10); the text is only re-rendered when it changes.
+    global _profiler_text
+    state = governor.state()
+    line = f"{state['frame_ms']:4.1f}/{state['budget_ms']:.1f} ms  tier {state['tier']} ({state['tier_name']})"
+    if _profiler_text[0] != line:
+        _profiler_text = (line, hud_text(line))
+    target.blit(_profiler_text[1], (20, HEIGHT - 40))
 
 def get_camera_offset(player):
     camera_x = player.rect.centerx - WIDTH//2
@@ -567,14 +1365,36 @@ def get_camera_offset(player):
     camera_y = max(0, min(camera_y, MAP_HEIGHT - HEIGHT))
     return (camera_x, camera_y)
 
+def memory_caches():
+    return {
+        "image_cache": image_cache,
+        "parallax_cache": parallax_cache,
+        "animation_cache": animation_cache,
+        "gif_frame_cache": gif_frame_cache,
+        "sprite_frames": {"player": player_frames, "boss": boss_frames},
+    }
+
+def print_memory_report(level, title):
+    print(memory_report.format_report(title, level, memory_caches()))
+
 # --------------------
 # Level Configurations
 # --------------------
+# "parallax" lists background layers from farthest to nearest: image, scroll
+# (fraction of the camera's horizontal movement), optional scroll_y (defaults
+# to scroll), y (screen position at the top of the map) and size (defaults to
+# the image's own size); "opaque": True drops the alpha channel of a far layer
+# that should always cover the screen. Levels without it use "background_image" stretched
+# over the whole map.
 levels_config = [
     # Level 1: Getting Guy'd
     {
         "background_color": (20, 20, 20),
-        "background_image": "images/environment/background/environment-background.png",
+        "parallax": [
+            {"image": "images/environment/background/background0.png", "size": (1067, 600), "opaque": True,
+             "scroll": 0.1, "scroll_y": 0},
+            {"image": "images/environment/background/midground.png", "size": (1125, 600), "scroll": 0.4, "scroll_y": 0},
+        ],
         "platforms": [
             {"tiled": True, "x": 0, "y": MAP_HEIGHT - 40,
              "tile_width": 50, "tile_height": 60,
@@ -601,7 +1421,11 @@ levels_config = [
     # Level 2: Sudden Death!
     {
         "background_color": (0, 0, 0),
-        "background_image": "images/environment/background/environment-background.png",
+        "parallax": [
+            {"image": "images/environment/background/background0.png", "size": (1067, 600), "opaque": True,
+             "scroll": 0.1, "scroll_y": 0},
+            {"image": "images/environment/background/midground.png", "size": (1125, 600), "scroll": 0.4, "scroll_y": 0},
+        ],
         "platforms": [
             {"tiled": True, "x": 0, "y": MAP_HEIGHT - 40,
              "tile_width": 50, "tile_height": 60,
@@ -636,7 +1460,11 @@ levels_config = [
     # Level 3: The Gauntlet
     {
         "background_color": (30, 0, 50),
-        "background_image": "images/environment/background/environment-background.png",
+        "parallax": [
+            {"image": "images/environment/background/background0.png", "size": (1067, 600), "opaque": True,
+             "scroll": 0.1, "scroll_y": 0},
+            {"image": "images/environment/background/midground.png", "size": (1125, 600), "scroll": 0.4, "scroll_y": 0},
+        ],
         "platforms": [
             {"tiled": True, "x": 0, "y": MAP_HEIGHT - 40,
              "tile_width": 50, "tile_height": 60,
@@ -673,7 +1501,11 @@ levels_config = [
     # Level 4: Final Challenge
     {
         "background_color": (0, 0, 0),
-        "background_image": "images/environment/background/environment-background.png",
+        "parallax": [
+            {"image": "images/environment/background/background0.png", "size": (1067, 600), "opaque": True,
+             "scroll": 0.1, "scroll_y": 0},
+            {"image": "images/environment/background/midground.png", "size": (1125, 600), "scroll": 0.4, "scroll_y": 0},
+        ],
         "platforms": [
             {"tiled": True, "x": 0, "y": MAP_HEIGHT - 40,
              "tile_width": 50, "tile_height": 60,
@@ -715,7 +1547,9 @@ levels_config = [
     # Level 5: Big Boss Fight
     {
         "background_color": (10, 10, 10),
-        "background_image": "images/environment/background/boss_background.png",
+        "parallax": [
+            {"image": "images/environment/background/boss_background.png", "scroll": 0.3, "scroll_y": 0, "y": -60},
+        ],
         "platforms": [
             {"tiled": True, "x": 0, "y": MAP_HEIGHT - 40,
              "tile_width": 50, "tile_height": 60,
@@ -769,6 +1603,65 @@ levels_config = [
     }
 ]
 
+# Levels saved by the level editor (level_editor.py) are written to
+# levels/level_<n>.json and loaded over the entries above at startup.
+LEVELS_DIR = "levels"
+TUPLE_KEYS = ("background_color", "color", "direction", "size")  # JSON has no tuples
+
+def level_file(index):
+    return os.path.join(LEVELS_DIR, f"level_{index + 1}.json")
+
+def _from_json(obj):
+    # Integer keys (tile codes, boss phases) come back from JSON as strings.
+    if obj and all(isinstance(key, str) and key.lstrip("-").isdigit() for key in obj):
+        obj = {int(key): value for key, value in obj.items()}
+    for key in TUPLE_KEYS:
+        if isinstance(obj.get(key), list):
+            obj[key] = tuple(obj[key])
+    return obj
+
+def format_level_config(config):
+    """JSON with one line per top-level key and per platform/obstacle/pickup entry."""
+    lines = []
+    for key, value in config.items():
+        if isinstance(value, list) and value and all(isinstance(entry, dict) for entry in value):
+            entries = ",\n".join("    " + json.dumps(entry) for entry in value)
+            lines.append(f"  {json.dumps(key)}: [\n{entries}\n  ]")
+        else:
+            lines.append(f"  {json.dumps(key)}: {json.dumps(value)}")
+    return "{\n" + ",\n".join(lines) + "\n}\n"
+
+def save_level_config(index):
+    """Writes levels_config[index] to its level file and returns the path."""
+    os.makedirs(LEVELS_DIR, exist_ok=True)
+    path = level_file(index)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        f.write(format_level_config(levels_config[index]))
+    os.replace(temp_path, path)  # Never leaves a half-written level behind
+    return path
+
+def load_level_files():
+    """Replaces (or, past the last level, appends) levels that have a saved level file."""
+    index = 0
+    while index < len(levels_config) or os.path.exists(level_file(index)):
+        path = level_file(index)
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    config = json.load(f, object_hook=_from_json)
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not load {path}: {e}")
+            else:
+                if index < len(levels_config):
+                    levels_config[index] = config
+                else:
+                    levels_config.append(config)
+                print(f"Loaded level {index + 1} from {path}")
+        index += 1
+
+load_level_files()
+
 # --------------------
 # Level Class
 # --------------------
@@ -781,81 +1674,112 @@ class Level:
         self.background_color = self.config.get("background_color", BLACK)
         self.difficulty_multiplier = difficulty_multiplier
         self.background_image_path = self.config.get("background_image", None)
-        if self.background_image_path:
+        self.parallax = None
+        if "parallax" in self.config:
+            layers = []
+            for layer_conf in self.config["parallax"]:
+                strip = load_parallax_strip(layer_conf["image"], layer_conf.get("size"), layer_conf.get("opaque", False))
+                if strip is None:
+                    continue  # Missing image (already warned about); draw the other layers
+                layers.append(ParallaxLayer(strip, layer_conf.get("scroll", 0.5), layer_conf.get("scroll_y"),
+                                            layer_conf.get("y", 0)))
+            if layers:
+                self.parallax = ParallaxBackground(layers, (WIDTH, HEIGHT), self.background_color)
+            self.background_image = None  # Without any layers, draw() fills with background_color
+        elif self.background_image_path:
             self.background_image = load_image(self.background_image_path, MAP_WIDTH, MAP_HEIGHT)
         else:
             self.background_image = None
 
-        for plat_conf in self.config.get("platforms", []):
-            if plat_conf.get("moving", False):
-                platform = MovingPlatform(
-                    plat_conf["x"],
-                    plat_conf["y"],
-                    plat_conf["w"],
-                    plat_conf["h"],
-                    plat_conf.get("color", RED),
-                    plat_conf.get("image", None),
-                    plat_conf.get("speed", 2),
-                    plat_conf.get("direction", (1, 0)),
-                    plat_conf.get("boundaries", (plat_conf["x"], plat_conf["x"] + 300, plat_conf["y"], plat_conf["y"]))
-                )
-            elif plat_conf.get("tiled", False):
-                platform = TiledBasePlatform(
-                    plat_conf["x"],
-                    plat_conf["y"],
-                    plat_conf["tiles"],
-                    plat_conf["tile_width"],
-                    plat_conf["tile_height"],
-                    plat_conf.get("tile_images", None)
+        # Obstacles updated as individual sprites (all of them, unless the
+        # level uses the array engine, which then keeps only the big bosses).
+        self.sprite_obstacles = self.obstacles
+        self.obstacle_engine = None
+        for section in ("platforms", "obstacles", "pickups"):
+            for conf in self.config.get(section, []):
+                self.add_entity(section, conf)
+        if self.config.get("obstacle_engine", False):
+            engine_obstacles = [o for o in self.obstacles if not isinstance(o, Boss)]
+            self.obstacle_engine = ObstacleEngine(engine_obstacles)
+            self.sprite_obstacles = pygame.sprite.Group(o for o in self.obstacles if isinstance(o, Boss))
+
+        self.set_goal(self.config.get("goal", {"x": MAP_WIDTH - 100,
+                                               "y": MAP_HEIGHT - 150,
+                                               "w": 50,
+                                               "h": 50,
+                                               "color": GOLD}))
+
+        self.challenge_message = self.config.get("challenge_message", None)
+        self.message_surface = None  # Rendered on first draw
+
+    # Each platform, obstacle and pickup is built from its own config entry
+    # (kept on the sprite as .config), so the level editor can add, rebuild or
+    # remove a single entity without rebuilding the whole level.
+    def build_platform(self, plat_conf):
+        if plat_conf.get("moving", False):
+            platform = MovingPlatform(
+                plat_conf["x"],
+                plat_conf["y"],
+                plat_conf["w"],
+                plat_conf["h"],
+                plat_conf.get("color", RED),
+                plat_conf.get("image", None),
+                plat_conf.get("speed", 2),
+                plat_conf.get("direction", (1, 0)),
+                plat_conf.get("boundaries", (plat_conf["x"], plat_conf["x"] + 300, plat_conf["y"], plat_conf["y"]))
+            )
+        elif plat_conf.get("tiled", False):
+            platform = TiledBasePlatform(
+                plat_conf["x"],
+                plat_conf["y"],
+                plat_conf["tiles"],
+                plat_conf["tile_width"],
+                plat_conf["tile_height"],
+                plat_conf.get("tile_images", None),
+                plat_conf.get("trap_tiles", DEFAULT_TRAP_TILES)
+            )
+        else:
+            platform = Platform(
+                plat_conf["x"],
+                plat_conf["y"],
+                plat_conf["w"],
+                plat_conf["h"],
+                plat_conf.get("color", RED),
+                plat_conf.get("image", None)
+            )
+        return platform
+
+    def build_obstacle(self, obs_conf):
+        speed = obs_conf.get("speed", 2) * self.difficulty_multiplier
+        image_path = obs_conf.get("image", None)
+        if obs_conf.get("boss", False):
+            boss_type = obs_conf.get("boss_type", "small")
+            if boss_type == "small":
+                obstacle = SmallBoss(
+                    obs_conf["x"],
+                    obs_conf["y"],
+                    obs_conf["w"],
+                    obs_conf["h"],
+                    speed,
+                    image_path,
+                    obs_conf.get("dynamic", False)
                 )
-            else:
-                platform = Platform(
-                    plat_conf["x"],
-                    plat_conf["y"],
-                    plat_conf["w"],
-                    plat_conf["h"],
-                    plat_conf.get("color", RED),
-                    plat_conf.get("image", None)
+            elif boss_type == "big":
+                obstacle = Boss(
+                    obs_conf["x"],
+                    obs_conf["y"],
+                    obs_conf["w"],
+                    obs_conf["h"],
+                    speed,
+                    boss_frames,
+                    obs_conf.get("dynamic", False),
+                    attacks=compile_attacks(obs_conf["attacks"]) if "attacks" in obs_conf else None
                 )
-            self.platforms.add(platform)
-
-        for obs_conf in self.config.get("obstacles", []):
-            speed = obs_conf.get("speed", 2) * self.difficulty_multiplier
-            image_path = obs_conf.get("image", None)
-            if obs_conf.get("boss", False):
-                boss_type = obs_conf.get("boss_type", "small")
-                if boss_type == "small":
-                    obstacle = SmallBoss(
-                        obs_conf["x"],
-                        obs_conf["y"],
-                        obs_conf["w"],
-                        obs_conf["h"],
-                        speed,
-                        image_path,
-                        obs_conf.get("dynamic", False)
-                    )
-                elif boss_type == "big":
-                    obstacle = Boss(
-                        obs_conf["x"],
-                        obs_conf["y"],
-                        obs_conf["w"],
-                        obs_conf["h"],
-                        speed,
-                        boss_frames,
-                        obs_conf.get("dynamic", False)
-                    )
-                else:
-                    obstacle = SmallBoss(
-                        obs_conf["x"],
-                        obs_conf["y"],
-                        obs_conf["w"],
-                        obs_conf["h"],
-                        speed,
-                        image_path,
-                        obs_conf.get("dynamic", False)
-                    )
+                reserve_bullets(obstacle.attacks)
+                if "phase" in obs_conf:
+                    obstacle.set_phase(obs_conf["phase"], record=False)
             else:
-                obstacle = Obstacle(
+                obstacle = SmallBoss(
                     obs_conf["x"],
                     obs_conf["y"],
                     obs_conf["w"],
@@ -864,30 +1788,60 @@ class Level:
                     image_path,
                     obs_conf.get("dynamic", False)
                 )
-            if obs_conf.get("vertical", False):
-                obstacle.vertical = True
-            self.obstacles.add(obstacle)
-
-        for pickup_conf in self.config.get("pickups", []):
-            ptype = pickup_conf.get("type", "health")
-            value = pickup_conf.get("value", 20 if ptype=="health" else 1)
-            image_path = pickup_conf.get("image", None)
-            pickup = Pickup(
-                pickup_conf["x"],
-                pickup_conf["y"],
-                pickup_conf["w"],
-                pickup_conf["h"],
-                ptype,
-                value,
-                image_path
+        else:
+            obstacle = Obstacle(
+                obs_conf["x"],
+                obs_conf["y"],
+                obs_conf["w"],
+                obs_conf["h"],
+                speed,
+                image_path,
+                obs_conf.get("dynamic", False)
             )
-            self.pickups.add(pickup)
+        if obs_conf.get("vertical", False):
+            obstacle.vertical = True
+        return obstacle
 
-        goal_conf = self.config.get("goal", {"x": MAP_WIDTH - 100,
-                                               "y": MAP_HEIGHT - 150,
-                                               "w": 50,
-                                               "h": 50,
-                                               "color": GOLD})
+    def build_pickup(self, pickup_conf):
+        ptype = pickup_conf.get("type", "health")
+        value = pickup_conf.get("value", 20 if ptype=="health" else 1)
+        image_path = pickup_conf.get("image", None)
+        pickup = Pickup(
+            pickup_conf["x"],
+            pickup_conf["y"],
+            pickup_conf["w"],
+            pickup_conf["h"],
+            ptype,
+            value,
+            image_path
+        )
+        return pickup
+
+    def add_entity(self, section, conf):
+        """Builds one "platforms"/"obstacles"/"pickups" entry and adds it to the level."""
+        if section == "platforms":
+            sprite = self.build_platform(conf)
+            self.platforms.add(sprite)
+        elif section == "obstacles":
+            sprite = self.build_obstacle(conf)
+            self.obstacles.add(sprite)
+            if self.obstacle_engine and not isinstance(sprite, Boss):
+                self.obstacle_engine.add(sprite)
+            elif self.sprite_obstacles is not self.obstacles:
+                self.sprite_obstacles.add(sprite)
+        else:
+            sprite = self.build_pickup(conf)
+            self.pickups.add(sprite)
+        sprite.config = conf
+        sprite.config_section = section
+        return sprite
+
+    def rebuild_entity(self, sprite):
+        """Replaces a sprite with a fresh one built from its (edited) config entry."""
+        sprite.kill()
+        return self.add_entity(sprite.config_section, sprite.config)
+
+    def set_goal(self, goal_conf):
         self.goal = pygame.Rect(
             goal_conf.get("x", MAP_WIDTH - 100),
             goal_conf.get("y", MAP_HEIGHT - 150),
@@ -901,69 +1855,126 @@ class Level:
         else:
             self.goal_image = None
 
-        self.challenge_message = self.config.get("challenge_message", None)
-
     def draw(self, screen, camera_offset):
-        if self.background_image:
-            screen.blit(self.background_image, (-camera_offset[0], -camera_offset[1]))
+        target = as_render_target(screen)
+        if self.parallax:
+            self.parallax.draw(target, camera_offset, governor.quality["background"])
+        elif self.background_image and governor.quality["background"]:
+            target.blit(self.background_image, (-camera_offset[0], -camera_offset[1]))
         else:
-            screen.fill(self.background_color)
+            target.fill(self.background_color)
         for sprite in self.platforms:
-            screen.blit(sprite.image, (sprite.rect.x - camera_offset[0], sprite.rect.y - camera_offset[1]))
-        for sprite in self.obstacles:
-            screen.blit(sprite.image, (sprite.rect.x - camera_offset[0], sprite.rect.y - camera_offset[1]))
+            pos = (sprite.rect.x - camera_offset[0], sprite.rect.y - camera_offset[1])
+            if isinstance(sprite, TiledBasePlatform):
+                target.blit_tiles(sprite.tiles, pos)  # Baked in place; only changed cells are re-scaled
+            else:
+                target.blit(sprite.image, pos)
+        if self.obstacle_engine:
+            view = pygame.Rect(camera_offset[0], camera_offset[1], WIDTH, HEIGHT)
+            visible = self.obstacle_engine.sync(view)
+            target.blits([(sprite.image, (sprite.rect.x - camera_offset[0], sprite.rect.y - camera_offset[1]))
+                          for sprite in visible])
+        for sprite in self.sprite_obstacles:
+            target.blit(sprite.image, (sprite.rect.x - camera_offset[0], sprite.rect.y - camera_offset[1]))
         for sprite in self.pickups:
-            screen.blit(sprite.image, (sprite.rect.x - camera_offset[0], sprite.rect.y - camera_offset[1]))
+            target.blit(sprite.image, (sprite.rect.x - camera_offset[0], sprite.rect.y - camera_offset[1]))
         if self.goal_image:
-            screen.blit(self.goal_image, (self.goal.x - camera_offset[0], self.goal.y - camera_offset[1]))
+            target.blit(self.goal_image, (self.goal.x - camera_offset[0], self.goal.y - camera_offset[1]))
         else:
-            pygame.draw.rect(screen, self.goal_color,
+            target.draw_rect(self.goal_color,
                              (self.goal.x - camera_offset[0], self.goal.y - camera_offset[1],
                               self.goal.width, self.goal.height))
         if self.challenge_message:
-            font = pygame.font.SysFont(None, 36)
-            message = font.render(self.challenge_message, True, WHITE)
-            screen.blit(message, (WIDTH//2 - message.get_width()//2, 20))
+            if self.message_surface is None:
+                self.message_surface = hud_text(self.challenge_message)
+            message = self.message_surface
+            target.blit(message, (WIDTH//2 - message.get_width()//2, 20))
+
+    def unload(self):
+        # Kill obstacles so their timers are cancelled when the level ends.
+        for obstacle in self.obstacles.sprites():
+            obstacle.kill()
+
+    def obstacles_at(self, rect):
+        """Live obstacles whose rect overlaps the given rect."""
+        hits = [o for o in self.sprite_obstacles if o.rect.colliderect(rect)]
+        if self.obstacle_engine:
+            hits.extend(self.obstacle_engine.query(rect))
+        return hits
 
-    def update(self):
-        self.obstacles.update()
+    def update(self, dt=1.0):
+        if self.obstacle_engine:
+            self.obstacle_engine.step(dt)
+        self.sprite_obstacles.update(dt)
         for platform in self.platforms:
             if hasattr(platform, 'update'):
-                platform.update()
+                platform.update(dt)
 
 # --------------------
 # Main Menu and Game Loop
 # --------------------
+# Menus are ScreenStack screens: each is rendered once into a cached surface
+# and the stack waits on events instead of redrawing every frame.
+ABOUT_LINES = [
+    "Welcome to I Wanna Be The Guy Tribute!",
+    "",
+    "How to Play:",
+    "  - Use LEFT/RIGHT arrow keys to move.",
+    "  - Press SPACE to jump.",
+    "  - Press F to cast a spell (costs mana).",
+    "  - Collect health and mana pickups.",
+    "  - Avoid obstacles and reach the goal to progress.",
+    "",
+    "Press any key to continue..."
+]
+DIFFICULTY_KEYS = {pygame.K_1: "Easy", pygame.K_2: "Medium", pygame.K_3: "Hard"}
+
+class AboutScreen(Screen):
+    def render(self, size):
+        surface = pygame.Surface(size).convert()
+        surface.fill(BLACK)
+        font_title = pygame.font.SysFont(None, 60)
+        font_text = pygame.font.SysFont(None, 36)
+        title_surface = font_title.render("How to Play", True, WHITE)
+        surface.blit(title_surface, (size[0] // 2 - title_surface.get_width() // 2, 50))
+        for i, line in enumerate(ABOUT_LINES):
+            surface.blit(font_text.render(line, True, WHITE), (50, 150 + i * 40))
+        return surface
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            self.stack.pop()
+
+class DifficultyScreen(Screen):
+    def render(self, size):
+        surface = pygame.Surface(size).convert()
+        surface.fill(BLACK)
+        font = pygame.font.SysFont(None, 48)
+        lines = ["Select Difficulty", "1. Easy", "2. Medium", "3. Hard"]
+        for i, line in enumerate(lines):
+            text = font.render(line, True, WHITE)
+            surface.blit(text, (size[0] // 2 - text.get_width() // 2, 100 + i * 100))
+        return surface
+
+    def handle_event(self, event):
+        global selected_difficulty
+        if event.type == pygame.KEYDOWN and event.key in DIFFICULTY_KEYS:
+            selected_difficulty = DIFFICULTY_KEYS[event.key]
+            self.stack.clear()
+
+def present_screen(surface):
+    present_frame(RenderTarget(surface))
+
+def show_about_screen():
+    stack = ScreenStack((WIDTH, HEIGHT), present_screen)
+    stack.push(AboutScreen())
+    stack.run()
+
 def main_menu():
-    global selected_difficulty
-    show_about_screen()
-    font = pygame.font.SysFont(None, 48)
-    while True:
-        screen.fill(BLACK)
-        title_text = font.render("Select Difficulty", True, WHITE)
-        easy_text = font.render("1. Easy", True, WHITE)
-        medium_text = font.render("2. Medium", True, WHITE)
-        hard_text = font.render("3. Hard", True, WHITE)
-        screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 100))
-        screen.blit(easy_text, (WIDTH//2 - easy_text.get_width()//2, 200))
-        screen.blit(medium_text, (WIDTH//2 - medium_text.get_width()//2, 300))
-        screen.blit(hard_text, (WIDTH//2 - hard_text.get_width()//2, 400))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_1:
-                    selected_difficulty = "Easy"
-                    return
-                elif event.key == pygame.K_2:
-                    selected_difficulty = "Medium"
-                    return
-                elif event.key == pygame.K_3:
-                    selected_difficulty = "Hard"
-                    return
-        clock.tick(FPS)
+    stack = ScreenStack((WIDTH, HEIGHT), present_screen)
+    stack.push(DifficultyScreen())
+    stack.push(AboutScreen())  # Shown first; any key reveals the difficulty choice
+    stack.run()
 
 def get_camera_offset(player):
     camera_x = player.rect.centerx - WIDTH//2
@@ -972,81 +1983,141 @@ def get_camera_offset(player):
     camera_y = max(0, min(camera_y, MAP_HEIGHT - HEIGHT))
     return (camera_x, camera_y)
 
+# --------------------
+# Simulation Step
+# --------------------
+# One frame of game rules, shared by the game loop and the headless training
+# environment (training_env.py), so both play by exactly the same rules.
+MANA_COST = 10
+
+def fire_spell(player):
+    if player.mana < MANA_COST:
+        print("Not enough mana!")
+        return False
+    print("Spell fired!")
+    audio.play("spell")
+    bullet_group.add(Bullet(player.rect.centerx, player.rect.centery, player.facing,
+                            image_path="images/environment/spells/fire_ball_spell.png"))
+    player.mana -= MANA_COST
+    return True
+
+def simulate_frame(player, level, dt=1.0, controls=None):
+    """
+    Advances the world by one step and resolves its collisions. Returns a dict
+    of what happened this step: damage taken, obstacles killed, damage dealt to
+    bosses, pickups collected and whether the goal was reached.
+    """
+    global aim_target
+    events = {"damage": 0, "kills": 0, "boss_damage": 0, "pickups": 0, "pickup_types": [], "goal": False}
+    aim_target = player.rect
+    timers.advance_time(dt)
+    player.update(level.platforms.sprites(), dt, controls)
+    bullet_group.update(dt)
+    boss_projectiles.update(dt)
+    level.update(dt)
+    # Process bullet collisions (now manually so that boss damage is gradual)
+    for bullet in bullet_group:
+        swept_area = bullet.rect.union(getattr(bullet, "prev_rect", bullet.rect))
+        for obstacle in level.obstacles_at(swept_area):
+            if not projectile_hits(bullet, obstacle):
+                continue
+            if isinstance(obstacle, Boss):
+                obstacle.health -= 10  # Reduced damage per bullet
+                events["boss_damage"] += 10
+                audio.play("boss_hit")
+                bullet.kill()
+                if obstacle.health <= 0:
+                    obstacle.end_phase()
+                    obstacle.kill()
+                    events["kills"] += 1
+            else:
+                bullet.kill()
+                obstacle.kill()
+                events["kills"] += 1
+    # Check collision with boss projectiles
+    if pygame.sprite.spritecollide(player, boss_projectiles, True,
+                                   lambda p, projectile: projectile_hits(projectile, p)):
+        player.health -= 10
+        player.last_damage = "boss_projectile"
+        events["damage"] += 10
+        audio.play("player_hit")
+        print("Player hit by a boss projectile!")
+    # Check collision with other obstacles
+    hit_obstacle = any(sprites_touch(player, o) for o in level.obstacles_at(player.rect))
+    if hit_obstacle and player.damage_cooldown == 0:
+        player.health -= 20
+        player.last_damage = "obstacle"
+        events["damage"] += 20
+        audio.play("player_hit")
+        player.start_damage_cooldown(30)
+        player.rect.topleft = (50, MAP_HEIGHT - 100)
+        player.vel_y = 0
+    pickup_hits = pygame.sprite.spritecollide(player, level.pickups, True)
+    for pickup in pickup_hits:
+        if pickup.ptype == "health":
+            player.health = min(100, player.health + pickup.value)
+            print("Picked up health!")
+        elif pickup.ptype == "bullet":
+            player.mana = min(100, player.mana + pickup.value * 10)
+            print("Picked up mana!")
+    events["pickups"] = len(pickup_hits)
+    events["pickup_types"] = [pickup.ptype for pickup in pickup_hits]
+    if pickup_hits:
+        audio.play("pickup")
+    # For levels with bosses, lock the goal until all bosses are defeated.
+    if player.rect.colliderect(level.goal):
+        events["goal"] = not any(isinstance(obstacle, Boss) and obstacle.health > 0
+                                 for obstacle in level.sprite_obstacles)
+    return events
+
 def game_loop():
+    global show_profiler
     difficulty_multiplier = DIFFICULTY[selected_difficulty]
     current_level_index = 0  # For testing, you can adjust the starting level here.
     total_levels = len(levels_config)
-    MANA_COST = 10
     desired_width = 64
     desired_height = 64
     scaled_player_frames = [pygame.transform.scale(frame, (desired_width, desired_height))
                             for frame in player_frames]
     player = Player(50, MAP_HEIGHT - 100, frames=scaled_player_frames, frame_duration=100)
     player_group = [player]
+    track("session_start", difficulty=selected_difficulty, levels=total_levels)
     while True:
         level = Level(levels_config[current_level_index], difficulty_multiplier)
+        if MEMORY_REPORT:
+            print_memory_report(level, f"Level {current_level_index + 1}")
+        # Per-attempt counters for telemetry
+        level_started = pygame.time.get_ticks()
+        spells = 0
+        pickups = collections.Counter()
+        bosses = [obstacle for obstacle in level.obstacles if isinstance(obstacle, Boss)]
+        track("level_start", level=current_level_index + 1)
         level_running = True
         while level_running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    track_level_end("quit", current_level_index + 1, level_started, spells, pickups, bosses)
                     pygame.quit()
                     sys.exit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         player.jump()
+                    if event.key == MEMORY_REPORT_KEY:
+                        print_memory_report(level, f"Level {current_level_index + 1}")
+                    if event.key == PROFILER_KEY:
+                        show_profiler = not show_profiler
                     pressed_key = event.unicode.lower()
                     if pressed_key == 'f' or pressed_key == 'ｆ':
-                        if player.mana >= MANA_COST:
-                            print("Spell fired!")
-                            new_bullet = Bullet(player.rect.centerx, player.rect.centery, player.facing,
-                                                 image_path="images/environment/spells/fire_ball_spell.png")
-                            bullet_group.add(new_bullet)
-                            player.mana -= MANA_COST
-                        else:
-                            print("Not enough mana!")
-            player.update(level.platforms.sprites())
-            bullet_group.update()
-            boss_projectiles.update()
-            level.update()
-            # Process bullet collisions (now manually so that boss damage is gradual)
-            for bullet in bullet_group:
-                for obstacle in level.obstacles:
-                    if bullet.rect.colliderect(obstacle.rect):
-                        if isinstance(obstacle, Boss):
-                            obstacle.health -= 10  # Reduced damage per bullet
-                            bullet.kill()
-                            if obstacle.health <= 0:
-                                obstacle.kill()
-                        else:
-                            bullet.kill()
-                            obstacle.kill()
-            # Check collision with boss projectiles
-            if pygame.sprite.spritecollide(player, boss_projectiles, True):
-                player.health -= 10
-                print("Player hit by a boss projectile!")
-            # Check collision with other obstacles
-            if pygame.sprite.spritecollide(player, level.obstacles, False) and player.damage_cooldown == 0:
-                player.health -= 20
-                player.damage_cooldown = 30
-                player.rect.topleft = (50, MAP_HEIGHT - 100)
-                player.vel_y = 0
-            pickup_hits = pygame.sprite.spritecollide(player, level.pickups, True)
-            for pickup in pickup_hits:
-                if pickup.ptype == "health":
-                    player.health = min(100, player.health + pickup.value)
-                    print("Picked up health!")
-                elif pickup.ptype == "bullet":
-                    player.mana = min(100, player.mana + pickup.value * 10)
-                    print("Picked up mana!")
-            # For levels with bosses, lock the goal until all bosses are defeated.
-            goal_reached = player.rect.colliderect(level.goal)
-            boss_alive = False
-            for obstacle in level.obstacles:
-                if isinstance(obstacle, Boss) and obstacle.health > 0:
-                    boss_alive = True
-                    break
-            if goal_reached and not boss_alive:
+                        if fire_spell(player):
+                            spells += 1
+            events = simulate_frame(player, level, SIM_DT)
+            if events["pickup_types"]:
+                pickups.update(events["pickup_types"])
+            if events["goal"]:
                 print(f"Level {current_level_index + 1} complete!")
+                track_level_end("level_complete", current_level_index + 1, level_started, spells, pickups, bosses,
+                                health=player.health)
+                audio.play("level_complete")
                 player.mana = 100
                 current_level_index += 1
                 if current_level_index >= total_levels:
@@ -1057,46 +2128,67 @@ def game_loop():
                     player.rect.topleft = (50, MAP_HEIGHT - 100)
                     player.vel_y = 0
                     bullet_group.empty()
-                    boss_projectiles.empty()
+                    clear_boss_projectiles()
                     level_running = False
+            if snapshot_server:
+                snapshot_server.publish(snapshots.capture_state(player, current_level_index, level,
+                                                                bullet_group, boss_projectiles))
             if player.health <= 0:
+                audio.play("game_over")
+                track_level_end("death", current_level_index + 1, level_started, spells, pickups, bosses,
+                                cause=player.last_damage)
                 current_level_index = reset_game(player)
                 bullet_group.empty()
-                boss_projectiles.empty()
+                clear_boss_projectiles()
                 break
             camera_offset = get_camera_offset(player)
-            level.draw(screen, camera_offset)
-            for spr in player_group:
-                screen.blit(spr.image, (spr.rect.x - camera_offset[0], spr.rect.y - camera_offset[1]))
-            draw_sprite_group(bullet_group, screen, camera_offset)
-            draw_sprite_group(boss_projectiles, screen, camera_offset)
-            # Draw Player Health Bar
-            bar_width = 200
-            bar_height = 20
-            health_percentage = player.health / 100
-            current_bar_width = int(bar_width * health_percentage)
-            pygame.draw.rect(screen, RED, (20, 20, bar_width, bar_height))
-            pygame.draw.rect(screen, GREEN, (20, 20, current_bar_width, bar_height))
-            # Draw Player Mana Bar
-            mana_bar_width = 200
-            mana_bar_height = 20
-            mana_percentage = player.mana / 100
-            current_mana_width = int(mana_bar_width * mana_percentage)
-            pygame.draw.rect(screen, (0, 0, 100), (20, 50, mana_bar_width, mana_bar_height))
-            pygame.draw.rect(screen, (0, 0, 255), (20, 50, current_mana_width, mana_bar_height))
-            mana_text = pygame.font.SysFont(None, 36).render(f"Mana: {player.mana}", True, WHITE)
-            screen.blit(mana_text, (WIDTH - mana_text.get_width() - 20, 50))
-            # Draw Boss Health Bar for any Boss in the level
-            for obstacle in level.obstacles:
-                if isinstance(obstacle, Boss):
-                    obstacle.draw_health_bar(screen, camera_offset)
-            pygame.display.flip()
-            clock.tick(FPS)
+            governor.view = pygame.Rect(camera_offset, (WIDTH, HEIGHT))
+            target = get_render_target()
+            level.draw(target, camera_offset)
+            draw_sprite_group(player_group, target, camera_offset)
+            draw_sprite_group(bullet_group, target, camera_offset)
+            draw_sprite_group(boss_projectiles, target, camera_offset)
+            draw_hud(target, player, level, camera_offset)
+            if show_profiler:
+                draw_profiler(target)
+            present_frame(target)
+            animation_clock.tick(clock.tick(FPS))
+            governor.record(clock.get_rawtime())
+        level.unload()
 
 # --------------------
 # Main Execution
 # --------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="I Don't Wanna Be The Guy")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="trace Python allocations and print a memory report on every level load (F9 prints one any time)")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE,
+                        help="internal render resolution as a fraction of the window, e.g. 0.5 or 0.75")
+    parser.add_argument("--no-governor", action="store_true",
+                        help="keep full quality even when frames run over budget")
+    parser.add_argument("--mute", action="store_true", help="don't open the audio device")
+    parser.add_argument("--serve-snapshots", type=int, metavar="PORT",
+                        help="stream game state to spectator/co-op clients on this local port")
+    parser.add_argument("--telemetry-file", default="telemetry.log",
+                        help="session metrics log (rotated by size, written from a background thread)")
+    parser.add_argument("--no-telemetry", action="store_true", help="don't record session metrics")
+    args = parser.parse_args()
+    RENDER_SCALE = args.render_scale
+    governor.enabled = not args.no_governor
+    if args.mute:
+        pygame.mixer.quit()  # pygame.init() above already opened the device
+    else:
+        audio.warm_up()
+    if args.serve_snapshots is not None:
+        snapshot_server = snapshots.SnapshotServer(port=args.serve_snapshots)
+        print(f"Serving snapshots on port {snapshot_server.port}")
+    if not args.no_telemetry:
+        telemetry = TelemetryWriter(args.telemetry_file)
+        atexit.register(telemetry.close)  # The game exits through sys.exit() from inside the loop
+    if args.memory_report:
+        tracemalloc.start()
+        MEMORY_REPORT = True
     main_menu()
     game_loop()
     pygame.quit()
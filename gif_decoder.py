@@ -0,0 +1,174 @@
+"""
+Minimal animated GIF decoder.
+
+pygame.image.load only returns the first frame of a GIF, so this module
+decodes every frame (LZW, interlacing, transparency and frame disposal) into
+full-canvas RGBA arrays. It is only run once per file at load time; the game
+caches the resulting surfaces.
+"""
+import numpy as np
+
+DEFAULT_DELAY_MS = 100  # Browsers treat a 0/1 centisecond delay as ~100 ms
+
+
+def _read_sub_blocks(data, pos):
+    chunks = []
+    while True:
+        size = data[pos]
+        pos += 1
+        if size == 0:
+            return b"".join(chunks), pos
+        chunks.append(data[pos:pos + size])
+        pos += size
+
+
+def _lzw_decode(data, min_code_size, pixel_count):
+    clear_code = 1 << min_code_size
+    end_code = clear_code + 1
+    code_size = min_code_size + 1
+    table = [bytes([i]) for i in range(clear_code)] + [b"", b""]
+    out = bytearray()
+    prev = None
+    acc = acc_bits = pos = 0
+    while len(out) < pixel_count:
+        while acc_bits < code_size:
+            if pos >= len(data):
+                return bytes(out)
+            acc |= data[pos] << acc_bits
+            acc_bits += 8
+            pos += 1
+        code = acc & ((1 << code_size) - 1)
+        acc >>= code_size
+        acc_bits -= code_size
+
+        if code == clear_code:
+            del table[clear_code + 2:]
+            code_size = min_code_size + 1
+            prev = None
+            continue
+        if code == end_code:
+            break
+        if prev is None:
+            entry = table[code]
+        elif code < len(table):
+            entry = table[code]
+            if len(table) < 4096:
+                table.append(prev + entry[:1])
+        elif code == len(table):
+            entry = prev + prev[:1]
+            table.append(entry)
+        else:
+            raise ValueError("Corrupt GIF: invalid LZW code")
+        out += entry
+        prev = entry
+        if len(table) == (1 << code_size) and code_size < 12:
+            code_size += 1
+    return bytes(out[:pixel_count])
+
+
+def _deinterlace(indices, width, height):
+    rows = indices.reshape(height, width)
+    order = list(range(0, height, 8)) + list(range(4, height, 8)) + \
+        list(range(2, height, 4)) + list(range(1, height, 2))
+    result = np.empty_like(rows)
+    result[order] = rows
+    return result
+
+
+def decode_gif(path):
+    """
+    Returns a list of (rgba, delay_ms) tuples, one per frame, where rgba is a
+    (height, width, 4) uint8 array of the composited canvas.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:6] not in (b"GIF87a", b"GIF89a"):
+        raise ValueError(f"'{path}' is not a GIF file")
+
+    width = data[6] | data[7] << 8
+    height = data[8] | data[9] << 8
+    flags = data[10]
+    pos = 13
+    global_palette = None
+    if flags & 0x80:
+        size = 3 * (2 << (flags & 0x07))
+        global_palette = np.frombuffer(data[pos:pos + size], dtype=np.uint8).reshape(-1, 3)
+        pos += size
+
+    canvas = np.zeros((height, width, 4), dtype=np.uint8)
+    frames = []
+    delay = DEFAULT_DELAY_MS
+    transparent_index = None
+    disposal = 0
+
+    while pos < len(data):
+        block = data[pos]
+        pos += 1
+        if block == 0x3B:  # Trailer
+            break
+        if block == 0x21:  # Extension
+            label = data[pos]
+            pos += 1
+            body, pos = _read_sub_blocks(data, pos)
+            if label == 0xF9 and len(body) >= 4:  # Graphic control extension
+                disposal = (body[0] >> 2) & 0x07
+                centis = body[1] | body[2] << 8
+                delay = centis * 10 if centis > 1 else DEFAULT_DELAY_MS
+                transparent_index = body[3] if body[0] & 0x01 else None
+            continue
+        if block != 0x2C:
+            raise ValueError(f"Corrupt GIF '{path}': unexpected block 0x{block:02x}")
+
+        # Image descriptor
+        left = data[pos] | data[pos + 1] << 8
+        top = data[pos + 2] | data[pos + 3] << 8
+        fw = data[pos + 4] | data[pos + 5] << 8
+        fh = data[pos + 6] | data[pos + 7] << 8
+        fflags = data[pos + 8]
+        pos += 9
+        palette = global_palette
+        if fflags & 0x80:
+            size = 3 * (2 << (fflags & 0x07))
+            palette = np.frombuffer(data[pos:pos + size], dtype=np.uint8).reshape(-1, 3)
+            pos += size
+        if palette is None:
+            raise ValueError(f"Corrupt GIF '{path}': no color table")
+        min_code_size = data[pos]
+        pos += 1
+        lzw_data, pos = _read_sub_blocks(data, pos)
+
+        pixels = _lzw_decode(lzw_data, min_code_size, fw * fh)
+        indices = np.zeros(fw * fh, dtype=np.uint8)
+        indices[:len(pixels)] = np.frombuffer(pixels, dtype=np.uint8)
+        if fflags & 0x40:
+            indices = _deinterlace(indices, fw, fh)
+        else:
+            indices = indices.reshape(fh, fw)
+
+        # Clip the frame to the logical screen.
+        fw_c = max(0, min(fw, width - left))
+        fh_c = max(0, min(fh, height - top))
+        indices = indices[:fh_c, :fw_c]
+        region = canvas[top:top + fh_c, left:left + fw_c]
+        previous = canvas.copy() if disposal == 3 else None
+
+        visible = np.ones(indices.shape, dtype=bool)
+        if transparent_index is not None:
+            visible = indices != transparent_index
+        safe = np.minimum(indices, len(palette) - 1)
+        region[visible, :3] = palette[safe[visible]]
+        region[visible, 3] = 255
+
+        frames.append((canvas.copy(), delay))
+
+        if disposal == 2:
+            region[...] = 0
+        elif disposal == 3:
+            canvas[...] = previous
+        delay = DEFAULT_DELAY_MS
+        transparent_index = None
+        disposal = 0
+
+    if not frames:
+        raise ValueError(f"GIF '{path}' has no frames")
+    return frames
@@ -0,0 +1,179 @@
+"""
+Headless batch cropper.
+
+Reads a JSON manifest of named rectangles and polygons per source sheet and
+crops them all in one process, without opening a window. Each crop is written
+as its own PNG, or all crops are packed into a single sheet with a JSON index.
+
+Manifest format:
+
+    {
+        "output_dir": "images/cropped",
+        "sheets": [
+            {
+                "source": "images/environment/rpgcritters2.png",
+                "rects": {"critter_0": [0, 0, 32, 32]},
+                "polygons": {"ledge": [[0, 0], [40, 0], [40, 20], [0, 30]]}
+            }
+        ]
+    }
+
+Usage:
+    python image_cutter_batch.py manifest.json
+    python image_cutter_batch.py manifest.json --pack images/cropped/sheet.png
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # No window is ever opened
+
+import argparse
+import json
+import sys
+
+import pygame
+
+# --------------------
+# Cropping Helpers
+# --------------------
+def load_source(path):
+    if not os.path.exists(path):
+        sys.exit(f"Source image '{path}' not found.")
+    image = pygame.image.load(path)
+    # Without a display we cannot call convert_alpha(), so copy into a
+    # 32-bit SRCALPHA surface to get the same pixel format it would give.
+    surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+    surface.blit(image, (0, 0))
+    return surface
+
+
+def crop_rect(source, rect):
+    rect = pygame.Rect(rect).clip(source.get_rect())
+    if rect.width <= 0 or rect.height <= 0:
+        return None
+    return source.subsurface(rect).copy()
+
+
+def crop_polygon(source, points):
+    """
+    Same result as image_cutter_points.py: pixels outside the polygon become
+    transparent and the output is trimmed to the polygon's bounding box.
+    The mask is applied with a single blend instead of a per-pixel loop.
+    """
+    if len(points) < 3:
+        return None
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    bbox = pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+    bbox = bbox.clip(source.get_rect())
+    if bbox.width <= 0 or bbox.height <= 0:
+        return None
+    # Draw the polygon in opaque white, then multiply the source into it:
+    # white keeps the source pixel, transparent black clears it.
+    cropped = pygame.Surface(bbox.size, pygame.SRCALPHA)
+    cropped.fill((0, 0, 0, 0))
+    local_points = [(x - bbox.x, y - bbox.y) for x, y in points]
+    pygame.draw.polygon(cropped, (255, 255, 255, 255), local_points)
+    cropped.blit(source, (0, 0), bbox, special_flags=pygame.BLEND_RGBA_MULT)
+    return cropped
+
+
+def crop_sheet(sheet_conf):
+    """Returns a list of (name, surface) for every crop in one manifest entry."""
+    source = load_source(sheet_conf["source"])
+    crops = []
+    for name, rect in sheet_conf.get("rects", {}).items():
+        surf = crop_rect(source, rect)
+        if surf is None:
+            print(f"Warning: rect '{name}' is empty or outside '{sheet_conf['source']}'.")
+            continue
+        crops.append((name, surf))
+    for name, points in sheet_conf.get("polygons", {}).items():
+        surf = crop_polygon(source, points)
+        if surf is None:
+            print(f"Warning: polygon '{name}' needs at least 3 points inside '{sheet_conf['source']}'.")
+            continue
+        crops.append((name, surf))
+    return crops
+
+# --------------------
+# Packed Sheet Output
+# --------------------
+def pack_crops(crops, max_width=1024, padding=1):
+    """
+    Simple shelf packer: tallest crops first, left to right, starting a new
+    row when the current one is full. Returns (sheet_surface, index) where
+    index maps each name to its [x, y, w, h] inside the sheet.
+    """
+    order = sorted(crops, key=lambda item: item[1].get_height(), reverse=True)
+    max_width = max([max_width] + [surf.get_width() for _, surf in order])
+    positions = {}
+    x = y = shelf_height = 0
+    sheet_width = 0
+    for name, surf in order:
+        w, h = surf.get_size()
+        if x > 0 and x + w > max_width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        positions[name] = [x, y, w, h]
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+        sheet_width = max(sheet_width, x - padding)
+    sheet_height = y + shelf_height
+    sheet = pygame.Surface((max(1, sheet_width), max(1, sheet_height)), pygame.SRCALPHA)
+    sheet.fill((0, 0, 0, 0))
+    for name, surf in order:
+        sheet.blit(surf, positions[name][:2])
+    return sheet, positions
+
+
+def run_manifest(manifest, output_dir=None, pack_path=None):
+    output_dir = output_dir or manifest.get("output_dir", "cropped")
+    crops = []
+    for sheet_conf in manifest.get("sheets", []):
+        for name, surf in crop_sheet(sheet_conf):
+            crops.append((name, surf))
+
+    names = [name for name, _ in crops]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        sys.exit(f"Duplicate crop names in manifest: {', '.join(duplicates)}")
+
+    if pack_path:
+        sheet, index = pack_crops(crops)
+        pack_dir = os.path.dirname(pack_path)
+        if pack_dir:
+            os.makedirs(pack_dir, exist_ok=True)
+        pygame.image.save(sheet, pack_path)
+        index_path = os.path.splitext(pack_path)[0] + ".json"
+        with open(index_path, "w") as f:
+            json.dump(index, f, indent=2)
+        print(f"Packed {len(crops)} crops into '{pack_path}' (index: '{index_path}')")
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+        for name, surf in crops:
+            pygame.image.save(surf, os.path.join(output_dir, f"{name}.png"))
+        print(f"Saved {len(crops)} crops to '{output_dir}'")
+    return crops
+
+# --------------------
+# Main Execution
+# --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crop named rects and polygons from sprite sheets without a window.")
+    parser.add_argument("manifest", help="Path to the JSON crop manifest")
+    parser.add_argument("--output-dir", help="Directory for individual PNGs (overrides the manifest)")
+    parser.add_argument("--pack", metavar="PATH", help="Write one packed sheet to PATH instead of individual PNGs")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.manifest):
+        sys.exit(f"Manifest '{args.manifest}' not found.")
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    pygame.init()
+    run_manifest(manifest, args.output_dir, args.pack)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 import pygame
 import sys
+import os
+
+# TileMap lives at the repository root.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from tilemap import TileMap
 
 # Initialize Pygame
 pygame.init()
@@ -44,21 +49,18 @@ tile_map = [
     ["c3", "e",  "e",  "e",  "c4"]
 ]
 
-def draw_tile(tile_type, x, y):
-    """Draw a single tile image based on tile_type at (x, y)."""
-    if tile_type == "c1":
-        screen.blit(corner1, (x, y))
-    elif tile_type == "c2":
-        screen.blit(corner2, (x, y))
-    elif tile_type == "c3":
-        screen.blit(corner3, (x, y))
-    elif tile_type == "c4":
-        screen.blit(corner4, (x, y))
-    elif tile_type == "e":
-        screen.blit(edge, (x, y))
-    elif tile_type == "w":
-        screen.blit(wall, (x, y))
-    # If empty or unknown, do nothing
+# Map each tile code to its image. Empty or unknown codes draw nothing.
+tile_images = {
+    "c1": corner1,
+    "c2": corner2,
+    "c3": corner3,
+    "c4": corner4,
+    "e": edge,
+    "w": wall,
+}
+
+# Bake the layout once; drawing it is then a single blit per frame.
+platform_tiles = TileMap(tile_map, TILE_WIDTH, TILE_HEIGHT, tile_images)
 
 # Main game loop
 clock = pygame.time.Clock()
@@ -73,11 +75,7 @@ while True:
     screen.fill((110, 180, 160))  # any color you want
 
     # Draw the tile map in the top-left corner of the screen
-    for row_index, row in enumerate(tile_map):
-        for col_index, tile_code in enumerate(row):
-            x_pos = col_index * TILE_WIDTH
-            y_pos = row_index * TILE_HEIGHT
-            draw_tile(tile_code, x_pos, y_pos)
+    platform_tiles.draw(screen, (0, 0))
 
     # Place the tree somewhere in the background.
     # For example, at (x=150, y=10).
@@ -0,0 +1,325 @@
+"""
+Level editor running on top of a live game.Level.
+
+Assets are loaded once (on import of game.py); switching levels, editing and
+play-testing all happen in the same process. Each edit changes the level's
+config entry in levels_config and updates only what it affects: a moved or
+resized platform/obstacle/pickup is rebuilt from its own entry, a tile edit
+re-bakes one cell of its TileMap. Ctrl+S writes the level to
+levels/level_<n>.json, which the game loads over its built-in levels.
+
+    python level_editor.py --level 3
+
+Mouse:     left-drag moves platforms, obstacles, pickups and the goal
+           (hold Shift to place without the grid); a click on a tiled
+           platform cycles that tile through its codes and empty
+Keys:      arrows pan, [ ] shrink/grow the selection, Delete removes it
+           P platform, O obstacle, H health, M mana (added at the mouse),
+           G moves the goal to the mouse
+           Tab play-tests from the current edits (Tab/Esc returns),
+           PageUp/PageDown change level, Ctrl+S saves, Esc quits
+"""
+import argparse
+import sys
+
+import pygame
+
+import game
+
+SNAP = 10          # Grid for placing and resizing, in map pixels
+PAN_SPEED = 12     # Camera pixels per frame while an arrow key is held
+CLICK_DISTANCE = 3  # A press/release closer than this is a click, not a drag
+SELECT_COLOR = (255, 255, 0)
+HOVER_COLOR = (0, 255, 255)
+
+# Config entries for newly added entities (copied; x and y are set at the mouse).
+NEW_ENTITIES = {
+    pygame.K_p: ("platforms", {"w": 100, "h": 20, "image": "images/environment/background/float_plat.png"}),
+    pygame.K_o: ("obstacles", {"w": 30, "h": 30, "speed": 3, "dynamic": True,
+                               "image": "images/environment/small_boss/small_boss_1.png"}),
+    pygame.K_h: ("pickups", {"type": "health", "w": 50, "h": 50, "value": 20,
+                             "image": "images/environment/spells/Heart.png"}),
+    pygame.K_m: ("pickups", {"type": "bullet", "w": 50, "h": 50, "value": 1,
+                             "image": "images/environment/spells/mana_poition.png"}),
+}
+
+
+def snap(value, free=False):
+    return int(value) if free else int(round(value / SNAP) * SNAP)
+
+
+def window_to_map(pos, camera):
+    """Window pixel -> map coordinates, undoing present_frame's letterbox."""
+    win_w, win_h = pygame.display.get_surface().get_size()
+    fit = min(win_w / game.WIDTH, win_h / game.HEIGHT)
+    left = (win_w - int(game.WIDTH * fit)) // 2
+    top = (win_h - int(game.HEIGHT * fit)) // 2
+    return ((pos[0] - left) / fit + camera[0], (pos[1] - top) / fit + camera[1])
+
+
+class LevelEditor:
+    def __init__(self, level_index=0):
+        self.camera = [0, 0]
+        self.font = pygame.font.SysFont(None, 24)
+        self.player = None      # Set while play-testing
+        self.player_frames = [pygame.transform.scale(frame, (64, 64)) for frame in game.player_frames]
+        self.load_level(level_index)
+
+    # --------------------
+    # Level and Selection
+    # --------------------
+    def load_level(self, index):
+        if getattr(self, "level", None):
+            self.level.unload()
+        game.bullet_group.empty()
+        game.clear_boss_projectiles()
+        self.level_index = index % len(game.levels_config)
+        self.config = game.levels_config[self.level_index]
+        self.level = game.Level(self.config, 1)
+        self.selected = None    # A sprite, "goal" or None
+        self.drag = None        # (press position, grab offset, moved)
+        self.unsaved = False
+
+    def entity_at(self, point):
+        """Topmost editable thing under a map point: "goal", a sprite, or None."""
+        if self.level.goal.collidepoint(point):
+            return "goal"
+        for group in (self.level.pickups, self.level.obstacles, self.level.platforms):
+            for sprite in reversed(group.sprites()):
+                if sprite.rect.collidepoint(point):
+                    return sprite
+        return None
+
+    def selected_rect(self):
+        if self.selected == "goal":
+            return self.level.goal
+        return self.selected.rect if self.selected else None
+
+    def goal_config(self):
+        return self.config.setdefault("goal", {"x": self.level.goal.x, "y": self.level.goal.y,
+                                               "w": self.level.goal.width, "h": self.level.goal.height})
+
+    def entry_for(self, thing):
+        return self.goal_config() if thing == "goal" else thing.config
+
+    # --------------------
+    # Edits
+    # --------------------
+    def move_selected(self, x, y):
+        """Moves the selection on screen only; the config is written on release."""
+        rect = self.selected_rect()
+        dx, dy = x - rect.x, y - rect.y
+        rect.topleft = (x, y)
+        if isinstance(self.selected, game.MovingPlatform):
+            left, right, top, bottom = self.selected.boundaries
+            self.selected.boundaries = (left + dx, right + dx, top + dy, bottom + dy)
+        if getattr(self.selected, "engine", None):
+            self.selected.engine.place(self.selected)
+
+    def commit_move(self):
+        rect = self.selected_rect()
+        entry = self.entry_for(self.selected)
+        if (entry.get("x"), entry.get("y")) == rect.topleft:
+            return
+        entry["x"], entry["y"] = rect.topleft
+        if isinstance(self.selected, game.MovingPlatform):
+            entry["boundaries"] = list(self.selected.boundaries)
+        self.unsaved = True
+
+    def resize_selected(self, step):
+        if self.selected is None or isinstance(self.selected, game.TiledBasePlatform):
+            return
+        entry = self.entry_for(self.selected)
+        rect = self.selected_rect()
+        entry["w"] = max(SNAP, rect.width + step)
+        entry["h"] = max(SNAP, rect.height + step)
+        if self.selected == "goal":
+            self.level.set_goal(entry)
+        else:
+            # The image has to be reloaded at the new size; rebuild only this sprite.
+            self.selected = self.level.rebuild_entity(self.selected)
+        self.unsaved = True
+
+    def delete_selected(self):
+        if self.selected is None or self.selected == "goal":
+            return
+        entries = self.config[self.selected.config_section]
+        del entries[next(i for i, entry in enumerate(entries) if entry is self.selected.config)]
+        self.selected.kill()
+        self.selected = None
+        self.unsaved = True
+
+    def add_entity(self, key, point):
+        section, template = NEW_ENTITIES[key]
+        entry = dict(template, x=snap(point[0] - template["w"] / 2), y=snap(point[1] - template["h"] / 2))
+        self.config.setdefault(section, []).append(entry)
+        self.selected = self.level.add_entity(section, entry)
+        self.unsaved = True
+
+    def move_goal(self, point):
+        entry = self.goal_config()
+        entry["x"], entry["y"] = snap(point[0] - self.level.goal.width / 2), snap(point[1] - self.level.goal.height / 2)
+        self.level.set_goal(entry)
+        self.selected = "goal"
+        self.unsaved = True
+
+    def cycle_tile(self, platform, point):
+        cell = platform.tiles.cell_at(point[0] - platform.rect.x, point[1] - platform.rect.y)
+        if cell is None:
+            return
+        row, col = cell
+        codes = sorted(platform.tile_images, key=str) + [game.EMPTY_TILE]
+        current = platform.tiles.get_tile(row, col)
+        code = codes[(codes.index(current) + 1) % len(codes)] if current in codes else codes[0]
+        # Only this cell of the baked surface (and its collision) is updated.
+        platform.set_tile(row, col, code)
+        platform.config["tiles"][row][col] = code
+        self.unsaved = True
+
+    def save(self):
+        path = game.save_level_config(self.level_index)
+        self.unsaved = False
+        print(f"Saved level {self.level_index + 1} to {path}")
+
+    # --------------------
+    # Play-testing
+    # --------------------
+    def start_play(self):
+        self.player = game.Player(50, game.MAP_HEIGHT - 100, frames=self.player_frames, frame_duration=100)
+        self.selected = None
+
+    def stop_play(self, reason):
+        print(f"Play-test ended: {reason}")
+        self.player = None
+        unsaved = self.unsaved
+        # Play changes the level (pickups taken, obstacles killed); start again from the config.
+        self.load_level(self.level_index)
+        self.unsaved = unsaved
+
+    def play_frame(self):
+        events = game.simulate_frame(self.player, self.level, game.SIM_DT)
+        if events["goal"]:
+            self.stop_play("goal reached")
+        elif self.player.health <= 0:
+            self.stop_play("player died")
+        else:
+            self.camera = list(game.get_camera_offset(self.player))
+
+    # --------------------
+    # Events and Drawing
+    # --------------------
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            return False
+        if self.player:
+            if event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_TAB, pygame.K_ESCAPE):
+                    self.stop_play("stopped")
+                elif event.key == pygame.K_SPACE:
+                    self.player.jump()
+                elif event.key == pygame.K_f:
+                    game.fire_spell(self.player)
+            return True
+
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            point = window_to_map(event.pos, self.camera)
+            self.selected = self.entity_at(point)
+            rect = self.selected_rect()
+            if rect:
+                self.drag = (event.pos, (point[0] - rect.x, point[1] - rect.y), False)
+        elif event.type == pygame.MOUSEMOTION and self.drag:
+            press, grab, moved = self.drag
+            if moved or max(abs(event.pos[0] - press[0]), abs(event.pos[1] - press[1])) > CLICK_DISTANCE:
+                self.drag = (press, grab, True)
+                point = window_to_map(event.pos, self.camera)
+                free = pygame.key.get_mods() & pygame.KMOD_SHIFT
+                self.move_selected(snap(point[0] - grab[0], free), snap(point[1] - grab[1], free))
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.drag:
+            moved = self.drag[2]
+            self.drag = None
+            if moved:
+                self.commit_move()
+            elif isinstance(self.selected, game.TiledBasePlatform):
+                self.cycle_tile(self.selected, window_to_map(event.pos, self.camera))
+        elif event.type == pygame.KEYDOWN:
+            point = window_to_map(pygame.mouse.get_pos(), self.camera)
+            if event.key == pygame.K_ESCAPE:
+                return False
+            elif event.key == pygame.K_s and event.mod & pygame.KMOD_CTRL:
+                self.save()
+            elif event.key == pygame.K_TAB:
+                self.start_play()
+            elif event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                if self.unsaved:
+                    print(f"Level {self.level_index + 1} has unsaved edits (kept in memory until you quit)")
+                self.load_level(self.level_index + (1 if event.key == pygame.K_PAGEDOWN else -1))
+            elif event.key in (pygame.K_LEFTBRACKET, pygame.K_RIGHTBRACKET):
+                self.resize_selected(SNAP if event.key == pygame.K_RIGHTBRACKET else -SNAP)
+            elif event.key in (pygame.K_DELETE, pygame.K_BACKSPACE):
+                self.delete_selected()
+            elif event.key in NEW_ENTITIES:
+                self.add_entity(event.key, point)
+            elif event.key == pygame.K_g:
+                self.move_goal(point)
+        return True
+
+    def pan(self):
+        keys = pygame.key.get_pressed()
+        self.camera[0] += (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * PAN_SPEED
+        self.camera[1] += (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * PAN_SPEED
+        self.camera[0] = max(0, min(self.camera[0], game.MAP_WIDTH - game.WIDTH))
+        self.camera[1] = max(0, min(self.camera[1], game.MAP_HEIGHT - game.HEIGHT))
+
+    def draw_outline(self, surface, color, rect):
+        pygame.draw.rect(surface, color, rect.move(-self.camera[0], -self.camera[1]), 2)
+
+    def draw(self):
+        target = game.get_render_target()
+        camera = tuple(self.camera)
+        self.level.draw(target, camera)
+        if self.player:
+            game.draw_sprite_group([self.player], target, camera)
+            game.draw_sprite_group(game.bullet_group, target, camera)
+            game.draw_sprite_group(game.boss_projectiles, target, camera)
+            game.draw_hud(target, self.player, self.level, camera)
+            status = "PLAYING - Tab/Esc to stop"
+        else:
+            point = window_to_map(pygame.mouse.get_pos(), self.camera)
+            hover = self.entity_at(point)
+            if isinstance(hover, game.TiledBasePlatform):
+                cell = hover.tiles.cell_at(point[0] - hover.rect.x, point[1] - hover.rect.y)
+                if cell:
+                    self.draw_outline(target.surface, HOVER_COLOR, hover.tiles.cell_rect(*cell).move(hover.rect.topleft))
+            if self.selected:
+                self.draw_outline(target.surface, SELECT_COLOR, self.selected_rect())
+            status = f"EDIT  mouse {int(point[0])},{int(point[1])}"
+        title = f"Level {self.level_index + 1}/{len(game.levels_config)}{' *' if self.unsaved else ''}  {status}"
+        text = self.font.render(title, True, game.WHITE, game.BLACK)
+        target.surface.blit(text, (10, game.HEIGHT - text.get_height() - 10))
+        game.present_frame(target)
+
+    def run(self):
+        while True:
+            for event in pygame.event.get():
+                if not self.handle_event(event):
+                    if self.unsaved:
+                        print(f"Level {self.level_index + 1} has unsaved edits; quitting without saving")
+                    return
+            if self.player:
+                self.play_frame()
+            else:
+                self.pan()
+            self.draw()
+            game.animation_clock.tick(game.clock.tick(game.FPS))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Level editor for I Wanna Be The Guy Tribute.")
+    parser.add_argument("--level", type=int, default=1, help="level number to open (1-based)")
+    args = parser.parse_args()
+    pygame.display.set_caption("Level Editor")
+    # The editor draws at full detail and 1:1, so mouse positions map straight onto the map.
+    game.governor.enabled = False
+    LevelEditor(args.level - 1).run()
+    pygame.quit()
+    sys.exit()
@@ -0,0 +1,118 @@
+"""
+Memory accounting for levels and asset caches.
+
+Counts the pixel memory of every Surface reachable from a Level, its sprites
+and the global caches, plus tracemalloc totals for Python allocations.
+Surfaces are counted once even when shared (e.g. a cached image used by many
+sprites), and subsurface views count as zero because they share their
+parent's pixels.
+"""
+import tracemalloc
+
+import pygame
+
+
+def surface_bytes(surface):
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+def surfaces_in(value, depth=0):
+    """Yields every Surface held directly or inside containers/attributes of value."""
+    if depth > 6:
+        return
+    if isinstance(value, pygame.Surface):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from surfaces_in(item, depth + 1)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from surfaces_in(item, depth + 1)
+    elif hasattr(value, "__dict__") and not isinstance(value, (pygame.sprite.AbstractGroup, type)):
+        for name, item in vars(value).items():
+            # Don't walk back into engines or groups that own many sprites.
+            if name in ("engine", "groups"):
+                continue
+            yield from surfaces_in(item, depth + 1)
+
+
+def _unique_bytes(surfaces, seen):
+    total = 0
+    for surface in surfaces:
+        if id(surface) in seen:
+            continue
+        seen.add(id(surface))
+        total += surface_bytes(surface)
+    return total
+
+
+def cache_report(caches):
+    """caches: dict of name -> cache dict. Returns {name: (entries, bytes)}."""
+    report = {}
+    seen = set()
+    for name, cache in caches.items():
+        report[name] = (len(cache), _unique_bytes(surfaces_in(cache), seen))
+    return report
+
+
+def level_report(level, caches):
+    """
+    Returns a dict with the level's own surface bytes (not counting surfaces
+    that live in the caches) and a per-sprite-class breakdown.
+    """
+    seen = set()
+    for surface in surfaces_in(caches):
+        seen.add(id(surface))
+    shared_ids = set(seen)
+
+    level_bytes = _unique_bytes(surfaces_in([level.background_image, level.goal_image]), seen)
+    by_class = {}
+    for group in (level.platforms, level.obstacles, level.pickups):
+        for sprite in group:
+            name = type(sprite).__name__
+            count, own, shared = by_class.get(name, (0, 0, 0))
+            sprite_surfaces = list(surfaces_in(sprite))
+            own_bytes = _unique_bytes(sprite_surfaces, seen)
+            shared_bytes = sum(surface_bytes(s) for s in sprite_surfaces if id(s) in shared_ids)
+            by_class[name] = (count + 1, own + own_bytes, shared + shared_bytes)
+            level_bytes += own_bytes
+    return {"level_bytes": level_bytes, "by_class": by_class}
+
+
+def python_allocations(top=5):
+    """tracemalloc (current, peak, top lines) or None when not tracing."""
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    stats = tracemalloc.take_snapshot().statistics("lineno")[:top]
+    return current, peak, stats
+
+
+def _kb(size):
+    return f"{size / 1024:10.1f} KB"
+
+
+def format_report(title, level, caches):
+    lines = [f"==== Memory report: {title} ===="]
+    level_info = level_report(level, caches)
+    lines.append(f"Level surfaces (own):     {_kb(level_info['level_bytes'])}")
+    lines.append("  By sprite class:         count        own     shared (cached)")
+    for name, (count, own, shared) in sorted(level_info["by_class"].items(), key=lambda item: -item[1][1]):
+        lines.append(f"    {name:<20} {count:7d} {_kb(own)} {_kb(shared)}")
+    lines.append("Caches:                  entries")
+    total_cache = 0
+    for name, (entries, size) in cache_report(caches).items():
+        lines.append(f"    {name:<20} {entries:7d} {_kb(size)}")
+        total_cache += size
+    lines.append(f"Caches total:             {_kb(total_cache)}")
+    allocations = python_allocations()
+    if allocations is None:
+        lines.append("Python allocations: tracemalloc not running (start with --memory-report)")
+    else:
+        current, peak, stats = allocations
+        lines.append(f"Python allocations: current {_kb(current)}, peak {_kb(peak)}")
+        for stat in stats:
+            lines.append(f"    {stat}")
+    return "\n".join(lines)
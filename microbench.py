@@ -0,0 +1,312 @@
+"""
+Microbenchmarks for the hot functions in game.py, with JSON baselines.
+
+Each benchmark times one call of a function (after its setup) many times and
+records the median and best time per call in microseconds. stress_levels.py
+measures whole frames; this measures the pieces, so an optimisation can be
+checked on its own and a later change that undoes it shows up.
+
+    python microbench.py run --output baseline.json
+    python microbench.py compare baseline.json              # runs now and compares
+    python microbench.py compare baseline.json after.json --tolerance 0.15
+    python microbench.py list
+
+compare exits with status 1 when any benchmark is slower than its baseline
+by more than the tolerance (default 10%).
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+
+import game
+import stress_levels
+
+BENCHMARKS = {}  # name -> setup function returning the callable to time
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+# --------------------
+# Benchmarks
+# --------------------
+def _player():
+    return game.Player(50, game.MAP_HEIGHT - 100, frames=game.player_frames)
+
+
+@benchmark("check_trap_collision")
+def bench_trap_collision():
+    level = game.Level(game.levels_config[1], 1)
+    base = next(p for p in level.platforms if isinstance(p, game.TiledBasePlatform))
+    player = _player()
+    player.rect.midbottom = (base.rect.centerx, base.rect.top + 5)
+    return lambda: game.check_trap_collision(player, base)
+
+
+def _player_update(count):
+    level = game.Level(game.levels_config[0], 1)
+    platforms = level.platforms.sprites()
+    extra = [game.Platform(40 * (i % 30), 100 + 20 * (i // 30), 30, 10) for i in range(count - len(platforms))]
+    platforms = (platforms + extra)[:count]
+    player = _player()
+    controls = (False, True, False)
+
+    def run():
+        player.rect.topleft = (300, 300)
+        player.vel_y = 5
+        player.update(platforms, 1.0, controls)
+    return run
+
+
+@benchmark("Player.update[10 platforms]")
+def bench_player_update_10():
+    return _player_update(10)
+
+
+@benchmark("Player.update[100 platforms]")
+def bench_player_update_100():
+    return _player_update(100)
+
+
+@benchmark("Obstacle.update")
+def bench_obstacle_update():
+    obstacle = game.Obstacle(100, 100, 40, 40, 3, dynamic=True)
+    return obstacle.update
+
+
+@benchmark("Boss.update")
+def bench_boss_update():
+    boss = game.Boss(300, 300, 120, 120, 2, game.boss_frames, True)
+    return boss.update
+
+
+def _emitter_ms(emitter):
+    """Time from firing an emitter to its last delayed volley or burst."""
+    longest = max(volley.delay for volley in emitter.volleys)
+    if emitter.burst:
+        after, sub_emitter = emitter.burst
+        longest += after + _emitter_ms(sub_emitter)
+    return longest
+
+
+def _boss_attack(phase, attacks=None):
+    boss = game.Boss(300, 300, 120, 120, 2, game.boss_frames, True, attacks=attacks)
+    boss.set_phase(phase)
+    boss.move_timer.cancel()  # Only the attack's own timers should fire below
+    boss.attack_timer.cancel()
+    game.reserve_bullets(boss.attacks)
+    group = game.pygame.sprite.Group(boss)  # Volleys only leave from a live boss
+    # Delayed volleys and bursts are scheduled on game.timers; run the wheel
+    # through the longest of them so the whole script is timed.
+    longest = max((_emitter_ms(emitter) for emitter in boss.attacks.get(phase, ())), default=0)
+    ticks = game.ms_to_ticks(longest) if longest else 0
+
+    def run():
+        boss.attack()
+        if ticks:
+            game.timers.advance(ticks)
+        for bullet in game.boss_projectiles.sprites():
+            bullet.kill()  # Back to the pool, so every call starts the same
+    return run
+
+
+@benchmark("Boss.attack[phase 3]")
+def bench_boss_attack():
+    return _boss_attack(3)
+
+
+@benchmark("Boss.attack[scripted phase 2]")
+def bench_boss_attack_script():
+    return _boss_attack(2, game.compile_attacks(stress_levels.SCRIPTED_BOSS_ATTACKS))
+
+
+IMAGE_PATH = "images/environment/small_boss/small_boss_1.png"
+
+
+def _load_image_cold(bundle, size=(40, 40)):
+    def run():
+        game.image_cache.pop((IMAGE_PATH,) + size, None)
+        game.image_modes.pop(IMAGE_PATH, None)
+        saved, game.asset_bundle = game.asset_bundle, bundle
+        try:
+            game.load_image(IMAGE_PATH, *size)
+        finally:
+            game.asset_bundle = saved
+    return run
+
+
+@benchmark("load_image[cold]")
+def bench_load_image_cold():
+    return _load_image_cold(None)  # Decode and scale the PNG
+
+
+@benchmark("load_image[bundle]")
+def bench_load_image_bundle():
+    # Needs assets.bundle (python asset_bundle.py build); skipped without one.
+    # 60x60 is the size the levels use, so it is in the bundle.
+    if game.asset_bundle is None or game.asset_bundle.image(IMAGE_PATH, 60, 60) is None:
+        return None
+    return _load_image_cold(game.asset_bundle, (60, 60))
+
+
+@benchmark("load_image[warm]")
+def bench_load_image_warm():
+    game.load_image(IMAGE_PATH, 40, 40)
+    return lambda: game.load_image(IMAGE_PATH, 40, 40)
+
+
+@benchmark("slice_sprite_sheet[views]")
+def bench_slice_views():
+    return lambda: game.slice_sprite_sheet(game.sprite_sheet, game.sprite_width, game.sprite_height,
+                                           game.rows, copy=False)
+
+
+@benchmark("slice_sprite_sheet[copies]")
+def bench_slice_copies():
+    return lambda: game.slice_sprite_sheet(game.sprite_sheet, game.sprite_width, game.sprite_height, game.rows)
+
+
+def _level_init(config):
+    return lambda: game.Level(config, 1).unload()
+
+
+def _level_draw(config):
+    level = game.Level(config, 1)
+    target = game.get_render_target()
+    offsets = [(x, y) for x in range(0, 401, 100) for y in range(0, 201, 100)]
+    state = {"i": 0}
+
+    def run():
+        state["i"] = (state["i"] + 1) % len(offsets)
+        level.draw(target, offsets[state["i"]])
+    return run
+
+
+for _index, _config in enumerate(game.levels_config):
+    benchmark(f"Level.__init__[{_index + 1}]")(lambda config=_config: _level_init(config))
+    benchmark(f"Level.draw[{_index + 1}]")(lambda config=_config: _level_draw(config))
+
+# --------------------
+# Running and Comparing
+# --------------------
+def time_call(fn, min_time=0.2, repeat=5):
+    """Median and best microseconds per call over `repeat` timed batches."""
+    fn()  # Warm-up (caches, pools)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1 << 20:
+            break
+        number *= 2
+    per_call = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - start) / number)
+    return {"median_us": statistics.median(per_call) * 1e6, "min_us": min(per_call) * 1e6, "number": number}
+
+
+def run_benchmarks(names=None, repeat=5, min_time=0.2):
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and not any(part in name for part in names):
+            continue
+        game.timers.clear()
+        game.bullet_group.empty()
+        game.clear_boss_projectiles()
+        # The game prints debug lines; keep them out of the report.
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn = setup()
+            if fn is None:
+                continue
+            results[name] = time_call(fn, min_time, repeat)
+        print(f"{name:<34} {results[name]['median_us']:12.2f} us", file=sys.stderr)
+    return {
+        "meta": {"python": platform.python_version(), "pygame": game.pygame.version.ver,
+                 "machine": platform.machine(), "platform": platform.platform(), "time": time.time()},
+        "results": results,
+    }
+
+
+def compare(baseline, current, tolerance):
+    """Returns (lines, regressions) comparing medians benchmark by benchmark."""
+    lines = [f"{'benchmark':<34} {'baseline us':>12} {'current us':>12} {'change':>8}"]
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            lines.append(f"{name:<34} {'-':>12} {result['median_us']:12.2f}      new")
+            continue
+        change = result["median_us"] / base["median_us"] - 1
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -tolerance:
+            flag = "  improved"
+        lines.append(f"{name:<34} {base['median_us']:12.2f} {result['median_us']:12.2f} {change:+7.1%}{flag}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for game.py with JSON baselines.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="run the benchmarks and print or save the results")
+    run_parser.add_argument("--output", help="write the results to this JSON file")
+    compare_parser = sub.add_parser("compare", help="compare against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current", nargs="?", help="results JSON; runs the benchmarks when omitted")
+    compare_parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    for sub_parser in (run_parser, compare_parser):
+        sub_parser.add_argument("--filter", nargs="*", help="only benchmarks whose name contains one of these")
+        sub_parser.add_argument("--repeat", type=int, default=5)
+        sub_parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend per benchmark")
+    sub.add_parser("list", help="list the benchmarks")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        print("\n".join(BENCHMARKS))
+        return 0
+    if args.command == "run":
+        results = run_benchmarks(args.filter, args.repeat, args.min_time)
+        text = json.dumps(results, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run_benchmarks(args.filter or list(baseline["results"]), args.repeat, args.min_time)
+    lines, regressions = compare(baseline, current, args.tolerance)
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+import pygame
+
+# --------------------
+# Parallax Background
+# --------------------
+# Layers scroll at a fraction of the camera speed (scroll 0 = fixed to the
+# screen, 1 = moves with the map). Each layer image is kept once at its own
+# size and widened (by repeating it) into a strip at least as wide as the
+# screen, so any horizontal position needs at most two blits.
+def make_strip(image, min_width):
+    """Repeats image horizontally until it is at least min_width wide."""
+    w, h = image.get_size()
+    if w >= min_width:
+        return image
+    count = -(-min_width // w)
+    strip = pygame.Surface((w * count, h), image.get_flags() & pygame.SRCALPHA, image)
+    if image.get_colorkey() is not None:
+        strip.set_colorkey(image.get_colorkey(), pygame.RLEACCEL)
+    strip.blits([(image, (i * w, 0)) for i in range(count)], doreturn=False)
+    return strip
+
+
+class ParallaxLayer:
+    def __init__(self, strip, scroll=0.5, scroll_y=None, y=0):
+        self.strip = strip
+        self.scroll = scroll
+        self.scroll_y = scroll if scroll_y is None else scroll_y
+        self.y = y  # Screen y of the strip's top when the camera is at the top of the map
+        self.width = strip.get_width()
+
+    def draw(self, target, camera_offset, screen_width):
+        x = -int(camera_offset[0] * self.scroll) % self.width
+        y = self.y - int(camera_offset[1] * self.scroll_y)
+        if x == 0:
+            target.blit(self.strip, (0, y))
+        else:
+            target.blit(self.strip, (x - self.width, y))
+            if x < screen_width:
+                target.blit(self.strip, (x, y))
+
+
+class ParallaxBackground:
+    def __init__(self, layers, screen_size, fill_color=(0, 0, 0)):
+        """layers: ParallaxLayers from farthest to nearest."""
+        self.layers = layers
+        self.screen_width, self.screen_height = screen_size
+        self.fill_color = fill_color
+        # The fill can be skipped when the farthest layer is opaque and always covers the screen.
+        far = layers[0].strip if layers else None
+        self.covered = (far is not None and not far.get_flags() & pygame.SRCALPHA and far.get_colorkey() is None
+                        and layers[0].scroll_y == 0 and layers[0].y <= 0
+                        and layers[0].y + far.get_height() >= self.screen_height)
+
+    def draw(self, target, camera_offset, detail=True):
+        """detail=False draws only the farthest layer (for low quality tiers)."""
+        if not self.covered:
+            target.fill(self.fill_color)
+        for layer in self.layers if detail else self.layers[:1]:
+            layer.draw(target, camera_offset, self.screen_width)
@@ -0,0 +1,99 @@
+import sys
+
+import pygame
+
+# --------------------
+# Screen Stack (event-driven menus)
+# --------------------
+# Menus and other static screens are rendered once into a cached surface.
+# ScreenStack.run() then sleeps in pygame.event.wait() and only re-presents
+# the cached surface on window events, or re-renders it when the screen calls
+# invalidate(), so an idle menu uses next to no CPU.
+WINDOW_EVENTS = {
+    pygame.VIDEORESIZE, pygame.VIDEOEXPOSE, pygame.WINDOWRESIZED, pygame.WINDOWSIZECHANGED,
+    pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED, pygame.WINDOWMAXIMIZED,
+}
+
+
+class Screen:
+    """One entry on a ScreenStack. Subclasses implement render() and handle_event()."""
+    stack = None
+    surface = None  # Cached result of render()
+
+    def render(self, size):
+        """Returns a Surface of the given size showing this screen."""
+        raise NotImplementedError
+
+    def handle_event(self, event):
+        """Reacts to one input event; may push/pop screens or call invalidate()."""
+
+    def invalidate(self):
+        self.surface = None
+        if self.stack:
+            self.stack.dirty = True
+
+
+class ScreenStack:
+    def __init__(self, size, present, timeout_ms=1000):
+        """
+        size: the (width, height) screens render at.
+        present: callable that shows a rendered surface in the window.
+        timeout_ms: longest pygame.event.wait(), so the loop still wakes up now and then.
+        """
+        self.size = size
+        self.present = present
+        self.timeout_ms = timeout_ms
+        self.screens = []
+        self.dirty = True
+
+    @property
+    def top(self):
+        return self.screens[-1] if self.screens else None
+
+    def push(self, screen):
+        screen.stack = self
+        self.screens.append(screen)
+        self.dirty = True
+
+    def pop(self):
+        screen = self.screens.pop()
+        screen.stack = None
+        self.dirty = True
+        return screen
+
+    def replace(self, screen):
+        self.pop()
+        self.push(screen)
+
+    def clear(self):
+        while self.screens:
+            self.pop()
+
+    def quit(self):
+        pygame.quit()
+        sys.exit()
+
+    def run(self):
+        """Handles events until the stack is empty."""
+        motion_blocked = pygame.event.get_blocked(pygame.MOUSEMOTION)
+        pygame.event.set_blocked(pygame.MOUSEMOTION)  # Mouse movement shouldn't wake the menu
+        try:
+            while self.screens:
+                if self.dirty:
+                    screen = self.top
+                    if screen.surface is None:
+                        screen.surface = screen.render(self.size)
+                    self.present(screen.surface)
+                    self.dirty = False
+                event = pygame.event.wait(self.timeout_ms)
+                if event.type == pygame.NOEVENT:
+                    continue
+                if event.type == pygame.QUIT:
+                    self.quit()
+                elif event.type in WINDOW_EVENTS:
+                    self.dirty = True
+                else:
+                    self.top.handle_event(event)
+        finally:
+            if not motion_blocked:
+                pygame.event.set_allowed(pygame.MOUSEMOTION)
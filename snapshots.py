@@ -0,0 +1,327 @@
+"""
+Compact game-state snapshots for spectators and co-op clients.
+
+capture_state() reads the live game objects into a plain state dict.
+encode_full()/encode_delta() turn it into a small binary message: a delta
+only carries the entities that changed since the previous snapshot plus the
+ids that disappeared. decode() applies a message on top of the previous state.
+
+SnapshotServer streams length-prefixed messages to any number of TCP clients
+without blocking the frame loop (a client that falls too far behind is
+dropped). SnapshotClient receives and applies them. Run this file to open a
+simple spectator window:
+
+    python game.py --serve-snapshots 5555
+    python snapshots.py --port 5555
+"""
+import argparse
+import socket
+import struct
+import weakref
+import zlib
+
+FULL, DELTA = 0, 1
+COMPRESSED = 0x01
+COMPRESS_OVER = 256  # Only try zlib on bodies larger than this many bytes
+
+HEADER = struct.Struct("<BIIB")       # kind, frame, base frame, flags
+LENGTH = struct.Struct("<I")          # Length prefix on the wire
+PLAYER = struct.Struct("<hhfbhh")     # x, y, vel_y, facing, health, mana
+LEVEL = struct.Struct("<B")           # level index
+COUNT = struct.Struct("<H")
+ENTITY_ID = struct.Struct("<I")
+
+# Section name -> record layout (after the entity id).
+SECTIONS = [
+    ("obstacles", struct.Struct("<hhB")),     # x, y, kind
+    ("bosses", struct.Struct("<hB")),         # health, phase
+    ("bullets", struct.Struct("<hh")),        # x, y
+    ("projectiles", struct.Struct("<hh")),    # x, y
+    ("pickups", struct.Struct("<hhB")),       # x, y, type
+]
+OBSTACLE_KINDS = {"Obstacle": 0, "SmallBoss": 1, "Boss": 2}
+PICKUP_TYPES = {"health": 0, "bullet": 1}
+
+# --------------------
+# Capturing State
+# --------------------
+class EntityIds:
+    """Stable small ids for sprites, so deltas can refer to the same entity."""
+    def __init__(self):
+        self.ids = weakref.WeakKeyDictionary()
+        self.next_id = 1
+
+    def __call__(self, sprite):
+        entity_id = self.ids.get(sprite)
+        if entity_id is None:
+            entity_id = self.next_id
+            self.next_id += 1
+            self.ids[sprite] = entity_id
+        return entity_id
+
+
+entity_ids = EntityIds()
+
+
+def _clamp16(value):
+    return max(-32768, min(32767, int(value)))
+
+
+def capture_state(player, level_index, level, bullets, projectiles, ids=entity_ids):
+    obstacles = {}
+    bosses = {}
+    engine = level.obstacle_engine
+    for sprite in level.sprite_obstacles:
+        obstacles[ids(sprite)] = (_clamp16(sprite.rect.x), _clamp16(sprite.rect.y),
+                                  OBSTACLE_KINDS.get(type(sprite).__name__, 0))
+        if hasattr(sprite, "phase"):
+            bosses[ids(sprite)] = (_clamp16(sprite.health), sprite.phase)
+    if engine:
+        # Engine obstacles are read from the arrays; their rects may be stale.
+        for i in engine.alive.nonzero()[0]:
+            sprite = engine.sprites[i]
+            obstacles[ids(sprite)] = (_clamp16(engine.x[i]), _clamp16(engine.y[i]),
+                                      OBSTACLE_KINDS.get(type(sprite).__name__, 0))
+    return {
+        "player": (_clamp16(player.rect.x), _clamp16(player.rect.y), float(player.vel_y),
+                   player.facing, _clamp16(player.health), _clamp16(player.mana)),
+        "level": level_index,
+        "obstacles": obstacles,
+        "bosses": bosses,
+        "bullets": {ids(b): (_clamp16(b.rect.x), _clamp16(b.rect.y)) for b in bullets},
+        "projectiles": {ids(b): (_clamp16(b.rect.x), _clamp16(b.rect.y)) for b in projectiles},
+        "pickups": {ids(p): (_clamp16(p.rect.x), _clamp16(p.rect.y), PICKUP_TYPES.get(p.ptype, 0))
+                    for p in level.pickups},
+    }
+
+# --------------------
+# Encoding
+# --------------------
+def _pack_records(layout, records):
+    parts = [COUNT.pack(len(records))]
+    for entity_id, record in records.items():
+        parts.append(ENTITY_ID.pack(entity_id))
+        parts.append(layout.pack(*record))
+    return parts
+
+
+def _finish(kind, frame, base_frame, body):
+    flags = 0
+    if len(body) > COMPRESS_OVER:
+        packed = zlib.compress(body, 1)
+        if len(packed) < len(body):
+            body, flags = packed, COMPRESSED
+    return HEADER.pack(kind, frame, base_frame, flags) + body
+
+
+def encode_full(state, frame):
+    parts = [PLAYER.pack(*state["player"]), LEVEL.pack(state["level"])]
+    for name, layout in SECTIONS:
+        parts.extend(_pack_records(layout, state[name]))
+    return _finish(FULL, frame, frame, b"".join(parts))
+
+
+def encode_delta(previous, state, frame, base_frame):
+    parts = [PLAYER.pack(*state["player"]), LEVEL.pack(state["level"])]
+    for name, layout in SECTIONS:
+        old, new = previous[name], state[name]
+        changed = {entity_id: record for entity_id, record in new.items() if old.get(entity_id) != record}
+        removed = [entity_id for entity_id in old if entity_id not in new]
+        parts.extend(_pack_records(layout, changed))
+        parts.append(COUNT.pack(len(removed)))
+        parts.extend(ENTITY_ID.pack(entity_id) for entity_id in removed)
+    return _finish(DELTA, frame, base_frame, b"".join(parts))
+
+
+def decode(message, previous=None):
+    """Returns (frame, state). Deltas need the state they were encoded against."""
+    kind, frame, base_frame, flags = HEADER.unpack_from(message)
+    body = message[HEADER.size:]
+    if flags & COMPRESSED:
+        body = zlib.decompress(body)
+    if kind == DELTA and previous is None:
+        raise ValueError(f"Delta for frame {frame} needs the state of frame {base_frame}")
+
+    pos = 0
+    player = PLAYER.unpack_from(body, pos)
+    pos += PLAYER.size
+    (level,) = LEVEL.unpack_from(body, pos)
+    pos += LEVEL.size
+    state = {"player": player, "level": level}
+    for name, layout in SECTIONS:
+        records = dict(previous[name]) if kind == DELTA else {}
+        (count,) = COUNT.unpack_from(body, pos)
+        pos += COUNT.size
+        for _ in range(count):
+            (entity_id,) = ENTITY_ID.unpack_from(body, pos)
+            pos += ENTITY_ID.size
+            records[entity_id] = layout.unpack_from(body, pos)
+            pos += layout.size
+        if kind == DELTA:
+            (count,) = COUNT.unpack_from(body, pos)
+            pos += COUNT.size
+            for _ in range(count):
+                (entity_id,) = ENTITY_ID.unpack_from(body, pos)
+                pos += ENTITY_ID.size
+                records.pop(entity_id, None)
+        state[name] = records
+    return frame, state
+
+# --------------------
+# Networking
+# --------------------
+class _Connection:
+    def __init__(self, sock):
+        self.sock = sock
+        self.outgoing = bytearray()
+        self.needs_full = True
+
+    def flush(self):
+        while self.outgoing:
+            sent = self.sock.send(self.outgoing)
+            if sent == 0:
+                raise ConnectionError("client closed the connection")
+            del self.outgoing[:sent]
+
+
+class SnapshotServer:
+    def __init__(self, host="127.0.0.1", port=0, keyframe_interval=120, max_backlog=1 << 20):
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.port = self.listener.getsockname()[1]
+        self.keyframe_interval = keyframe_interval
+        self.max_backlog = max_backlog
+        self.connections = []
+        self.frame = 0
+        self.previous = None
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connections.append(_Connection(sock))
+
+    def publish(self, state):
+        """Sends this frame's state to every client; never blocks."""
+        self._accept()
+        self.frame += 1
+        keyframe = self.previous is None or self.frame % self.keyframe_interval == 0
+        full = delta = None
+        for conn in list(self.connections):
+            if conn.needs_full or keyframe:
+                if full is None:
+                    full = encode_full(state, self.frame)
+                message = full
+                conn.needs_full = False
+            else:
+                if delta is None:
+                    delta = encode_delta(self.previous, state, self.frame, self.frame - 1)
+                message = delta
+            conn.outgoing += LENGTH.pack(len(message)) + message
+            try:
+                conn.flush()
+            except BlockingIOError:
+                pass
+            except OSError:
+                self._drop(conn)
+                continue
+            if len(conn.outgoing) > self.max_backlog:
+                print("Snapshot client fell too far behind; disconnecting it.")
+                self._drop(conn)
+        self.previous = state
+
+    def _drop(self, conn):
+        conn.sock.close()
+        self.connections.remove(conn)
+
+    def close(self):
+        for conn in list(self.connections):
+            self._drop(conn)
+        self.listener.close()
+
+
+class SnapshotClient:
+    def __init__(self, host="127.0.0.1", port=5555):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setblocking(False)
+        self.incoming = bytearray()
+        self.frame = None
+        self.state = None
+        self.bytes_received = 0
+
+    def poll(self):
+        """Applies every message received so far and returns the latest state."""
+        while True:
+            try:
+                chunk = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                raise ConnectionError("snapshot server closed the connection")
+            self.incoming += chunk
+            self.bytes_received += len(chunk)
+        while len(self.incoming) >= LENGTH.size:
+            (size,) = LENGTH.unpack_from(self.incoming)
+            if len(self.incoming) < LENGTH.size + size:
+                break
+            message = bytes(self.incoming[LENGTH.size:LENGTH.size + size])
+            del self.incoming[:LENGTH.size + size]
+            self.frame, self.state = decode(message, self.state)
+        return self.state
+
+    def close(self):
+        self.sock.close()
+
+# --------------------
+# Spectator Window
+# --------------------
+def spectate(host, port):
+    import pygame
+
+    pygame.init()
+    scale = 2 / 3  # Whole 1200x800 map in an 800x533 window
+    window = pygame.display.set_mode((800, 533))
+    pygame.display.set_caption("Spectator")
+    font = pygame.font.SysFont(None, 24)
+    clock = pygame.time.Clock()
+    client = SnapshotClient(host, port)
+    colors = {0: (255, 0, 0), 1: (255, 120, 0), 2: (160, 0, 200)}
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                client.close()
+                pygame.quit()
+                return
+        state = client.poll()
+        window.fill((15, 15, 15))
+        if state:
+            def box(x, y, w, h, color):
+                pygame.draw.rect(window, color, (x * scale, y * scale, w * scale, h * scale))
+            for x, y, ptype in state["pickups"].values():
+                box(x, y, 50, 50, (0, 200, 0) if ptype == 0 else (0, 120, 255))
+            for entity_id, (x, y, kind) in state["obstacles"].items():
+                size = 120 if kind == 2 else 40
+                box(x, y, size, size, colors.get(kind, (255, 0, 0)))
+            for x, y in state["bullets"].values():
+                box(x, y, 20, 20, (255, 255, 0))
+            for x, y in state["projectiles"].values():
+                box(x, y, 16, 16, (0, 220, 255))
+            px, py, _, _, health, mana = state["player"]
+            box(px, py, 64, 64, (80, 80, 255))
+            text = f"Level {state['level'] + 1}  frame {client.frame}  HP {health}  MP {mana}  " \
+                   f"{client.bytes_received / 1024:.1f} KB received"
+            window.blit(font.render(text, True, (255, 255, 255)), (10, 10))
+        pygame.display.flip()
+        clock.tick(60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch a running game through its snapshot stream.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    args = parser.parse_args()
+    spectate(args.host, args.port)
@@ -0,0 +1,99 @@
+"""
+Sprite sheet slicing and grid detection.
+
+Kept free of import-time side effects (no display, no asset loading) so
+tools like test_char.py can use it without importing game.py.
+"""
+import numpy as np
+import pygame
+
+
+def slice_sprite_sheet(sheet, sprite_width=None, sprite_height=None, rows=None, copy=True):
+    """
+    Slices a sprite sheet into a list of lists, one sublist per row.
+    If the frame size is not given it is detected from the alpha channel.
+    With copy=False each frame is a subsurface view that shares the sheet's
+    pixels instead of a new Surface.
+    """
+    sheet_width, sheet_height = sheet.get_size()
+    if sprite_width is None or sprite_height is None:
+        detected_cols, detected_rows = detect_sprite_grid(sheet)
+        sprite_width = sprite_width or sheet_width // detected_cols
+        sprite_height = sprite_height or sheet_height // detected_rows
+    if rows is None:
+        rows = sheet_height // sprite_height
+    columns = sheet_width // sprite_width
+    sprites = []
+    for row in range(rows):
+        row_sprites = []
+        for col in range(columns):
+            rect = pygame.Rect(col * sprite_width, row * sprite_height, sprite_width, sprite_height)
+            sprite = sheet.subsurface(rect)
+            row_sprites.append(sprite.copy() if copy else sprite)
+        sprites.append(row_sprites)
+    return sprites
+
+def _sheet_opacity(sheet):
+    # Boolean (width, height) array of visible pixels. pixels_alpha is a view,
+    # so nothing is copied until the comparison.
+    if sheet.get_flags() & pygame.SRCALPHA:
+        return pygame.surfarray.pixels_alpha(sheet) > 0
+    colorkey = sheet.get_colorkey()
+    if colorkey is not None:
+        return pygame.surfarray.array2d(sheet) != sheet.map_rgb(colorkey)
+    return np.ones(sheet.get_size(), dtype=bool)
+
+def _grid_count(profile, min_cell=8, seam_ratio=0.25):
+    # Largest number of equal cells along one axis whose boundaries all fall
+    # on (nearly) empty lines. Touching frames still leave a thin seam, so a
+    # boundary is accepted if its coverage is well below the average.
+    size = len(profile)
+    filled = profile[profile > 0]
+    if size == 0 or filled.size == 0:
+        return 1
+    limit = filled.mean() * seam_ratio
+    for count in range(size // min_cell, 1, -1):
+        if size % count:
+            continue
+        pitch = size // count
+        seams = np.arange(1, count) * pitch
+        seam_cover = np.minimum(profile[seams], profile[seams - 1])
+        if np.all(seam_cover <= limit):
+            return count
+    return 1
+
+def detect_sprite_grid(sheet, min_cell=8):
+    """Returns (columns, rows) of a sprite sheet, detected from its alpha channel."""
+    opaque = _sheet_opacity(sheet)
+    cols = _grid_count(opaque.sum(axis=1), min_cell)
+    rows = _grid_count(opaque.sum(axis=0), min_cell)
+    return cols, rows
+
+def detect_frame_bounds(sheet, cols, rows):
+    """
+    Returns a rows x cols list of the visible bounds of each frame as a Rect
+    local to the frame, or None for an empty frame.
+    """
+    opaque = _sheet_opacity(sheet)
+    sheet_width, sheet_height = sheet.get_size()
+    cell_w, cell_h = sheet_width // cols, sheet_height // rows
+    cells = opaque[:cols * cell_w, :rows * cell_h].reshape(cols, cell_w, rows, cell_h)
+    x_used = cells.any(axis=3)   # (cols, cell_w, rows)
+    y_used = cells.any(axis=1)   # (cols, rows, cell_h)
+    non_empty = x_used.any(axis=1)
+    left = x_used.argmax(axis=1)
+    right = cell_w - x_used[:, ::-1, :].argmax(axis=1)
+    top = y_used.argmax(axis=2)
+    bottom = cell_h - y_used[:, :, ::-1].argmax(axis=2)
+    bounds = []
+    for row in range(rows):
+        row_bounds = []
+        for col in range(cols):
+            if non_empty[col, row]:
+                row_bounds.append(pygame.Rect(left[col, row], top[col, row],
+                                              right[col, row] - left[col, row],
+                                              bottom[col, row] - top[col, row]))
+            else:
+                row_bounds.append(None)
+        bounds.append(row_bounds)
+    return bounds
@@ -0,0 +1,228 @@
+"""
+Procedural stress levels for scaling benchmarks.
+
+generate_level() builds a level config in the same format as
+game.levels_config, with a chosen number of platforms, moving platforms,
+static/dynamic obstacles, pickups, ground tiles and Boss instances (optionally
+forced into a phase, or given the scripted attack patterns). The config can be passed straight to game.Level.
+
+Running this file headlessly measures frame time and level memory for one
+config, or for a sweep over one entity count:
+
+    python stress_levels.py --dynamic-obstacles 1000 --frames 300
+    python stress_levels.py --sweep dynamic_obstacles 10,100,1000,5000 --engine
+
+With --governor the frame-time governor is allowed to lower quality as it
+would in the game; the "tier" column is the quality tier it ended on.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+import game
+
+PLATFORM_IMAGE = "images/environment/background/float_plat.png"
+OBSTACLE_IMAGES = [
+    "images/environment/small_boss/small_boss_1.png",
+    "images/environment/small_boss/small_boss_2.png",
+]
+GROUND_IMAGES = {0: "images/environment/background/ground_1.png", 1: "images/environment/background/water.gif"}
+PICKUP_IMAGES = {"health": "images/environment/spells/Heart.png", "bullet": "images/environment/spells/mana_poition.png"}
+# A dense attack script (see bullet_patterns.py) using every pattern type,
+# delayed volleys and sub-emitter bursts; used with --scripted-bosses.
+SCRIPTED_BOSS_ATTACKS = {
+    1: [{"type": "aimed", "count": 3, "spread": 30, "speed": 8, "volleys": 3, "interval": 150}],
+    2: [{"type": "spiral", "arms": 4, "turn": 15, "speed": 6, "volleys": 8, "interval": 100},
+        {"type": "aimed", "speed": 10, "delay": 400}],
+    3: [{"type": "ring", "count": 16, "speed": 7},
+        {"type": "wave", "count": 3, "spread": 20, "amplitude": 40, "period": 8,
+         "speed": 8, "volleys": 8, "interval": 80, "origin": "bottom"},
+        {"type": "ring", "count": 6, "speed": 5, "delay": 400,
+         "image": "images/environment/spells/fire_ball_spell.png",
+         "burst": {"type": "ring", "count": 8, "speed": 6, "after": 600, "size": 30}}],
+}
+
+# --------------------
+# Level Generator
+# --------------------
+def generate_level(platforms=10, moving_platforms=2, static_obstacles=10, dynamic_obstacles=10,
+                   pickups=4, ground_tiles=24, trap_ratio=0.2, bosses=0, boss_phase=None,
+                   boss_attacks=None, obstacle_engine=False, seed=0):
+    rng = random.Random(seed)
+    map_w, map_h = game.MAP_WIDTH, game.MAP_HEIGHT
+
+    ground = [1 if 3 <= c < ground_tiles - 3 and rng.random() < trap_ratio else 0 for c in range(ground_tiles)]
+    platform_confs = [{"tiled": True, "x": 0, "y": map_h - 40, "tile_width": 50, "tile_height": 60,
+                       "tiles": [ground], "tile_images": dict(GROUND_IMAGES)}]
+    for _ in range(platforms):
+        w = rng.randint(60, 200)
+        platform_confs.append({"x": rng.randint(0, map_w - w), "y": rng.randint(150, map_h - 100),
+                               "w": w, "h": 20, "image": PLATFORM_IMAGE})
+    for _ in range(moving_platforms):
+        w = rng.randint(80, 160)
+        x = rng.randint(0, map_w - w - 300)
+        y = rng.randint(150, map_h - 100)
+        platform_confs.append({"x": x, "y": y, "w": w, "h": 20, "image": PLATFORM_IMAGE,
+                               "moving": True, "speed": rng.choice([1, 2, 3]), "direction": (1, 0),
+                               "boundaries": [x, x + w + 300, y, y]})
+
+    obstacle_confs = []
+    for index in range(static_obstacles + dynamic_obstacles):
+        size = rng.choice([30, 40, 60])
+        obstacle_confs.append({"x": rng.randint(1, map_w - size - 1), "y": rng.randint(1, map_h - size - 1),
+                               "w": size, "h": size, "speed": rng.uniform(1, 6),
+                               "vertical": rng.random() < 0.3,
+                               "boss": rng.random() < 0.5, "boss_type": "small",
+                               "image": rng.choice(OBSTACLE_IMAGES),
+                               "dynamic": index >= static_obstacles})
+    for _ in range(bosses):
+        boss_conf = {"boss": True, "boss_type": "big", "x": rng.randint(0, map_w - 120),
+                     "y": rng.randint(0, map_h - 200), "w": 120, "h": 120, "speed": 2, "dynamic": True}
+        if boss_phase:
+            boss_conf["phase"] = boss_phase
+        if boss_attacks:
+            boss_conf["attacks"] = boss_attacks
+        obstacle_confs.append(boss_conf)
+
+    pickup_confs = []
+    for _ in range(pickups):
+        ptype = rng.choice(["health", "bullet"])
+        pickup_confs.append({"type": ptype, "x": rng.randint(0, map_w - 50), "y": rng.randint(100, map_h - 100),
+                             "w": 50, "h": 50, "value": 20 if ptype == "health" else 1,
+                             "image": PICKUP_IMAGES[ptype]})
+
+    return {
+        "background_color": (20, 20, 20),
+        "background_image": "images/environment/background/environment-background.png",
+        "platforms": platform_confs,
+        "obstacles": obstacle_confs,
+        "pickups": pickup_confs,
+        "goal": {"x": map_w - 100, "y": map_h - 90, "w": 50, "h": 50,
+                 "color": game.GOLD, "image": "images/environment/open_gate.png"},
+        "obstacle_engine": obstacle_engine,
+        "challenge_message": "Stress Level",
+    }
+
+# --------------------
+# Headless Benchmark
+# --------------------
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_level(config, frames=300, difficulty="Easy", dt=1.0, governor=False):
+    """
+    Simulates `frames` frames of a level without a player input loop and
+    returns timings (ms per frame) for update, collision and draw, plus the
+    level's own surface memory.
+    """
+    game.governor = game.FrameGovernor(enabled=governor)
+    game.timers.clear()
+    game.bullet_group.empty()
+    game.clear_boss_projectiles()
+    level = game.Level(config, game.DIFFICULTY[difficulty])
+    player = game.Player(50, game.MAP_HEIGHT - 100, frames=game.player_frames)
+    update_ms, collide_ms, draw_ms, frame_ms = [], [], [], []
+    # The game prints debug lines for speed changes and attacks; keep them
+    # out of the terminal but still pay for them, as the game does.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(frames):
+            t0 = time.perf_counter()
+            game.timers.advance_time(dt)
+            player.update(level.platforms.sprites(), dt)
+            game.bullet_group.update(dt)
+            game.boss_projectiles.update(dt)
+            level.update(dt)
+            t1 = time.perf_counter()
+            level.obstacles_at(player.rect)
+            game.pygame.sprite.spritecollide(player, game.boss_projectiles, False)
+            game.pygame.sprite.spritecollide(player, level.pickups, False)
+            t2 = time.perf_counter()
+            camera_offset = game.get_camera_offset(player)
+            game.governor.view = game.pygame.Rect(camera_offset, (game.WIDTH, game.HEIGHT))
+            target = game.get_render_target()
+            level.draw(target, camera_offset)
+            game.draw_sprite_group(game.boss_projectiles, target, camera_offset)
+            t3 = time.perf_counter()
+            game.governor.record((t3 - t0) * 1000)
+            game.animation_clock.tick(dt * 1000 / game.FPS)
+            update_ms.append((t1 - t0) * 1000)
+            collide_ms.append((t2 - t1) * 1000)
+            draw_ms.append((t3 - t2) * 1000)
+            frame_ms.append((t3 - t0) * 1000)
+    memory = game.memory_report.level_report(level, game.memory_caches())
+    level.unload()
+    return {
+        "entities": len(level.platforms) + len(config["obstacles"]) + len(level.pickups),
+        "mean_ms": sum(frame_ms) / frames,
+        "p95_ms": _percentile(frame_ms, 95),
+        "update_ms": sum(update_ms) / frames,
+        "collide_ms": sum(collide_ms) / frames,
+        "draw_ms": sum(draw_ms) / frames,
+        "level_kb": memory["level_bytes"] / 1024,
+        "tier": game.governor.tier,
+    }
+
+
+COLUMNS = ["entities", "mean_ms", "p95_ms", "update_ms", "collide_ms", "draw_ms", "level_kb", "tier"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate stress levels and measure frame time and memory.")
+    parser.add_argument("--platforms", type=int, default=10)
+    parser.add_argument("--moving-platforms", type=int, default=2)
+    parser.add_argument("--static-obstacles", type=int, default=10)
+    parser.add_argument("--dynamic-obstacles", type=int, default=10)
+    parser.add_argument("--pickups", type=int, default=4)
+    parser.add_argument("--ground-tiles", type=int, default=24)
+    parser.add_argument("--bosses", type=int, default=0)
+    parser.add_argument("--boss-phase", type=int, choices=[1, 2, 3])
+    parser.add_argument("--scripted-bosses", action="store_true",
+                        help="give bosses SCRIPTED_BOSS_ATTACKS instead of the default attacks")
+    parser.add_argument("--engine", action="store_true", help="use the array-backed ObstacleEngine")
+    parser.add_argument("--difficulty", choices=list(game.DIFFICULTY), default="Easy")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--dt", type=float, default=1.0, help="simulation step in 60 FPS frames")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--governor", action="store_true", help="let the frame-time governor lower quality")
+    parser.add_argument("--sweep", nargs=2, metavar=("PARAM", "VALUES"),
+                        help="vary one generator parameter, e.g. --sweep dynamic_obstacles 10,100,1000")
+    args = parser.parse_args(argv)
+
+    params = {
+        "platforms": args.platforms,
+        "moving_platforms": args.moving_platforms,
+        "static_obstacles": args.static_obstacles,
+        "dynamic_obstacles": args.dynamic_obstacles,
+        "pickups": args.pickups,
+        "ground_tiles": args.ground_tiles,
+        "bosses": args.bosses,
+        "boss_phase": args.boss_phase,
+        "boss_attacks": SCRIPTED_BOSS_ATTACKS if args.scripted_bosses else None,
+        "obstacle_engine": args.engine,
+        "seed": args.seed,
+    }
+    if args.sweep:
+        name, values = args.sweep
+        if name not in params:
+            parser.error(f"unknown sweep parameter '{name}'")
+        runs = [(int(value), dict(params, **{name: int(value)})) for value in values.split(",")]
+    else:
+        name, runs = "run", [(0, params)]
+
+    print(",".join([name] + COLUMNS))
+    for value, run_params in runs:
+        result = run_level(generate_level(**run_params), args.frames, args.difficulty, args.dt, args.governor)
+        print(",".join([str(value)] + [f"{result[col]:.3f}" if isinstance(result[col], float) else str(result[col])
+                                       for col in COLUMNS]))
+
+
+if __name__ == "__main__":
+    main()
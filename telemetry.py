@@ -0,0 +1,131 @@
+"""
+Non-blocking gameplay telemetry.
+
+TelemetryWriter.record() only appends a tuple to an in-memory queue; a
+background thread wakes up every flush_interval seconds (or as soon as
+batch_size records are waiting), encodes the batch as compact JSON lines and
+appends it to the log in one write. Nothing on the game's thread touches the
+disk or encodes anything, so recording costs the same whether the disk is
+fast, slow or stalled. If the writer falls far behind, new records are
+dropped (and counted) instead of the queue growing without bound.
+
+The log rotates by size like logging's RotatingFileHandler: telemetry.log
+becomes telemetry.log.1, .1 becomes .2 and so on, keeping `backups` old
+files. Each line looks like
+
+    {"t":1760870000.123,"e":"death","level":2,"cause":"trap","ms":8123}
+
+t is the wall-clock time the record was made and e its kind; the other keys
+depend on the kind (see game.py for what the game records).
+"""
+import collections
+import json
+import os
+import threading
+import time
+
+
+class TelemetryWriter:
+    def __init__(self, path="telemetry.log", max_bytes=1 << 20, backups=3,
+                 flush_interval=1.0, batch_size=256, max_pending=10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.pending = collections.deque()  # append/popleft are thread-safe
+        self.max_pending = max_pending
+        # Only record() (the game thread) changes dropped; the writer thread
+        # logs the difference from reported_drops, so neither needs a lock.
+        self.dropped = 0
+        self.reported_drops = 0
+        self.written = 0
+        self.wake = threading.Event()
+        self.stopping = False
+        self.file = None
+        self.size = 0
+        self.failed = False
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def record(self, kind, **fields):
+        """Queues one record; never blocks."""
+        if len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self.pending.append((time.time(), kind, fields))
+        if len(self.pending) >= self.batch_size:
+            self.wake.set()
+
+    def close(self, timeout=2.0):
+        """Writes everything still queued and stops the thread."""
+        if self.stopping:
+            return
+        self.stopping = True
+        self.wake.set()
+        self.thread.join(timeout)
+
+    # --------------------
+    # Writer thread
+    # --------------------
+    def _run(self):
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            stopping = self.stopping
+            self._flush()
+            if stopping:
+                break
+        if self.file:
+            self.file.close()
+
+    def _flush(self):
+        while self.pending and not self.failed:
+            lines = []
+            while self.pending and len(lines) < self.batch_size:
+                t, kind, fields = self.pending.popleft()
+                record = {"t": round(t, 3), "e": kind}
+                record.update(fields)
+                lines.append(json.dumps(record, separators=(",", ":")) + "\n")
+            self._write(lines)
+        count = self.dropped - self.reported_drops
+        if count and not self.failed:
+            self.reported_drops += count
+            self._write([json.dumps({"t": round(time.time(), 3), "e": "dropped", "count": count},
+                                    separators=(",", ":")) + "\n"])
+
+    def _write(self, lines):
+        """Appends one batch, rotating first if it would push the file past max_bytes."""
+        data = "".join(lines).encode()
+        try:
+            if self.file is None:
+                self._open()
+            if self.size and self.size + len(data) > self.max_bytes:
+                self._rotate()
+            self.file.write(data)
+            self.file.flush()
+            self.size += len(data)
+            self.written += len(lines)
+        except OSError as e:
+            # Telemetry must never take the game down; stop writing instead.
+            print(f"Warning: telemetry disabled ({e})")
+            self.failed = True
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, "ab")
+        self.size = self.file.tell()
+
+    def _rotate(self):
+        self.file.close()
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
@@ -4,6 +4,10 @@ import os
 
 pygame.init()
 
+# Same slicer as the game, without importing game.py (which opens its window
+# and loads every level's assets).
+from sprite_sheets import slice_sprite_sheet, detect_sprite_grid, detect_frame_bounds
+
 image_cache = {}
 
 def load_image(path, w, h):
@@ -31,22 +35,6 @@ def get_image_details(file_path):
     print("Image size:", width, "x", height)
     return width, height
 
-def slice_sprite_sheet(sheet, sprite_width=32, sprite_height=32, rows=4):
-    """
-    Slices a sprite sheet into a list of lists. Each sublist contains sprites from one row.
-    """
-    sheet_width, sheet_height = sheet.get_size()
-    columns = sheet_width // sprite_width
-    sprites = []
-    for row in range(rows):
-        row_sprites = []
-        for col in range(columns):
-            rect = pygame.Rect(col * sprite_width, row * sprite_height, sprite_width, sprite_height)
-            sprite = sheet.subsurface(rect).copy()
-            row_sprites.append(sprite)
-        sprites.append(row_sprites)
-    return sprites
-
 WIDTH, HEIGHT = 800, 600              # Display size (window)
 MAP_WIDTH, MAP_HEIGHT = 1200, 800     # Full level (map) size
 FPS = 60
@@ -59,12 +47,12 @@ clock = pygame.time.Clock()
 boss_image_path = "images/environment/boss/mage-1-85x94.png"
 sheet_width, sheet_height = get_image_details(boss_image_path)
 boss_sheet = load_image(boss_image_path, sheet_width, sheet_height)
-# Assume there are 4 columns and 4 rows (adjust if needed)
-cols, rows = 4, 4
+# Detect the grid from the sheet's alpha channel instead of guessing it.
+cols, rows = detect_sprite_grid(boss_sheet)
 boss_width = sheet_width // cols
 boss_height = sheet_height // rows
 print("Each sprite is:", boss_width, "x", boss_height)
-all_boss_frames = slice_sprite_sheet(boss_sheet, boss_width, boss_height, rows)
+all_boss_frames = slice_sprite_sheet(boss_sheet, boss_width, boss_height, rows, copy=False)
 # Choose one row for the player's animation (here, row 1)
 boss_frames = all_boss_frames[1]
 
@@ -72,17 +60,19 @@ boss_frames = all_boss_frames[1]
 sheet_width, sheet_height = get_image_details(boss_image_path)
 boss_sheet = load_image(boss_image_path, sheet_width, sheet_height)
 
-# Assume there are 4 columns and 4 rows in the boss sprite sheet.
-cols, rows = 4, 2
+# Detect the grid from the sheet's alpha channel instead of guessing it.
+cols, rows = detect_sprite_grid(boss_sheet)
 boss_width = sheet_width // cols
 boss_height = sheet_height // rows
 print("Each boss sprite is:", boss_width, "x", boss_height)
 
 # Slice the boss sheet into frames.
-all_boss_frames = slice_sprite_sheet(boss_sheet, boss_width, boss_height, rows)
+all_boss_frames = slice_sprite_sheet(boss_sheet, boss_width, boss_height, rows, copy=False)
 # Choose one row for testing (e.g., row 1)
 print(len(all_boss_frames))
 boss_frames = all_boss_frames[1]
+# Visible part of each frame, outlined in the preview to check the detection.
+boss_bounds = detect_frame_bounds(boss_sheet, cols, rows)[1]
 
 
 current_frame = 0
@@ -102,6 +92,8 @@ while running:
 
     screen.fill((0, 0, 0))
     screen.blit(boss_frames[current_frame], (0, 0))
+    if boss_bounds[current_frame]:
+        pygame.draw.rect(screen, (0, 255, 0), boss_bounds[current_frame], 1)
     pygame.display.flip()
     clock.tick(60)
 
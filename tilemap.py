@@ -0,0 +1,121 @@
+import collections
+
+import pygame
+
+# --------------------
+# TileMap (baked tile grid)
+# --------------------
+# A grid of symbolic tile codes drawn through a code -> image table. The grid
+# is baked into one cached surface, so drawing it is a single blit per frame.
+# Changing a cell only re-blits that cell, and the changed cells are logged
+# by version so scaled copies (see RenderTarget) can refresh just those cells.
+CHANGE_LOG_SIZE = 256  # Cell changes remembered for dirty_since()
+
+class TileMap:
+    def __init__(self, tile_map, tile_width, tile_height, tile_images):
+        """
+        tile_map: list of rows of tile codes (any hashable, e.g. 0/1 or "c1").
+        tile_images: dict mapping a tile code to a Surface. Codes without an
+        image (empty cells) are left transparent.
+        """
+        # Copy the rows so edits never write back into a shared level config.
+        self.tiles = [list(row) for row in tile_map]
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.tile_images = dict(tile_images)
+        self.rows = len(self.tiles)
+        self.cols = len(self.tiles[0]) if self.rows > 0 else 0
+        self.surface = pygame.Surface((self.cols * tile_width, self.rows * tile_height), pygame.SRCALPHA)
+        # Cells per tile code, so swapping one code's image only touches its cells.
+        self.cells_by_code = {}
+        for r, row in enumerate(self.tiles):
+            for c, tile_code in enumerate(row):
+                self.cells_by_code.setdefault(tile_code, []).append((r, c))
+        self.version = 0  # Bumped on every change, so scaled copies know when to refresh
+        self.changes = collections.deque(maxlen=CHANGE_LOG_SIZE)  # (version, dirty Rect)
+        self.logged_from = 0  # Oldest version the change log is complete from
+        self.bake()
+
+    def bake(self):
+        """Redraws every cell into the cached surface."""
+        self.surface.fill((0, 0, 0, 0))
+        blits = []
+        for r, row in enumerate(self.tiles):
+            for c, tile_code in enumerate(row):
+                tile_img = self.tile_images.get(tile_code)
+                if tile_img:
+                    blits.append((tile_img, (c * self.tile_width, r * self.tile_height)))
+        self.surface.blits(blits, doreturn=False)
+        self.version += 1
+        self.changes.clear()  # Everything changed; older versions need a full refresh
+        self.logged_from = self.version
+
+    def _log_change(self, rect):
+        if len(self.changes) == self.changes.maxlen:
+            self.logged_from = self.changes[0][0]  # That version loses a rect
+        self.changes.append((self.version, rect))
+
+    def cell_rect(self, row, col):
+        return pygame.Rect(col * self.tile_width, row * self.tile_height, self.tile_width, self.tile_height)
+
+    def cell_at(self, x, y):
+        """Returns (row, col) for a point local to the map, or None if outside."""
+        col = int(x // self.tile_width)
+        row = int(y // self.tile_height)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def get_tile(self, row, col):
+        return self.tiles[row][col]
+
+    def set_tile(self, row, col, tile_code):
+        """
+        Changes one cell and re-bakes only that cell. Returns the dirty Rect
+        (local to the map), or None if the cell already had that code.
+        """
+        old_code = self.tiles[row][col]
+        if old_code == tile_code:
+            return None
+        self.tiles[row][col] = tile_code
+        self.cells_by_code[old_code].remove((row, col))
+        self.cells_by_code.setdefault(tile_code, []).append((row, col))
+        rect = self.cell_rect(row, col)
+        self.surface.fill((0, 0, 0, 0), rect)
+        tile_img = self.tile_images.get(tile_code)
+        if tile_img:
+            self.surface.blit(tile_img, rect)
+        self.version += 1
+        self._log_change(rect)
+        return rect
+
+    def set_tile_image(self, tile_code, image):
+        """Swaps the image for a tile code and re-bakes the cells that use it."""
+        self.tile_images[tile_code] = image
+        dirty = []
+        for r, c in self.cells_by_code.get(tile_code, ()):
+            rect = self.cell_rect(r, c)
+            self.surface.fill((0, 0, 0, 0), rect)
+            if image:
+                self.surface.blit(image, rect)
+            dirty.append(rect)
+        if dirty:
+            self.version += 1
+            for rect in dirty:
+                self._log_change(rect)
+        return dirty
+
+    def dirty_since(self, version):
+        """
+        Rects (local to the map) changed after the given version, or None when
+        the change log no longer reaches back that far and everything must be
+        treated as dirty.
+        """
+        if version == self.version:
+            return []
+        if not self.logged_from <= version < self.version:
+            return None
+        return [rect for changed, rect in self.changes if changed > version]
+
+    def draw(self, surface, pos):
+        surface.blit(self.surface, pos)
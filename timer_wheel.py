@@ -0,0 +1,129 @@
+"""
+Hierarchical timer wheel.
+
+Timers are kept in buckets keyed by their expiry tick, so advancing the wheel
+only touches the timers that are due (plus an occasional cascade of a coarse
+bucket into finer ones), no matter how many timers are pending.
+
+Time is measured in ticks of simulation time. The game advances the wheel by
+one tick per simulated frame.
+"""
+
+
+class Timer:
+    __slots__ = ("expires", "interval", "callback", "args", "cancelled")
+
+    def __init__(self, expires, interval, callback, args):
+        self.expires = expires
+        self.interval = interval  # None for one-shot timers
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        # Cancelled timers are simply skipped when their bucket comes up.
+        self.cancelled = True
+
+
+class TimerWheel:
+    def __init__(self, level_bits=(8, 6, 6, 6)):
+        self.now = 0
+        self.level_bits = level_bits
+        self.shifts = []
+        shift = 0
+        for bits in level_bits:
+            self.shifts.append(shift)
+            shift += bits
+        self.span = 1 << shift  # Timers further out than this wait in overflow
+        self.wheels = [[[] for _ in range(1 << bits)] for bits in level_bits]
+        self.overflow = []
+        self.pending = 0
+        self.fraction = 0.0  # Leftover part of a tick from advance_time
+
+    def schedule(self, delay, callback, *args):
+        """Calls callback(*args) after `delay` ticks (at least one)."""
+        timer = Timer(self.now + max(1, int(delay)), None, callback, args)
+        self._insert(timer)
+        return timer
+
+    def schedule_repeating(self, interval, callback, *args):
+        """Calls callback(*args) every `interval` ticks until cancelled."""
+        interval = max(1, int(interval))
+        timer = Timer(self.now + interval, interval, callback, args)
+        self._insert(timer)
+        return timer
+
+    def _insert(self, timer):
+        self.pending += 1
+        delta = timer.expires - self.now
+        if delta >= self.span:
+            self.overflow.append(timer)
+            return
+        for level, bits in enumerate(self.level_bits):
+            shift = self.shifts[level]
+            if delta < (1 << (shift + bits)):
+                slot = (timer.expires >> shift) & ((1 << bits) - 1)
+                self.wheels[level][slot].append(timer)
+                return
+
+    def _cascade(self, level):
+        # Move one bucket of a coarse wheel into the finer wheels below it.
+        shift = self.shifts[level]
+        slot = (self.now >> shift) & ((1 << self.level_bits[level]) - 1)
+        bucket = self.wheels[level][slot]
+        self.wheels[level][slot] = []
+        for timer in bucket:
+            self.pending -= 1
+            if not timer.cancelled:
+                self._insert(timer)
+        return slot
+
+    def advance(self, ticks=1):
+        """Moves time forward, firing every timer that comes due."""
+        for _ in range(ticks):
+            self.now += 1
+            # Cascade coarser wheels whenever the finer one wraps around.
+            level = 1
+            while level < len(self.level_bits) and (self.now & ((1 << self.shifts[level]) - 1)) == 0:
+                if self._cascade(level) != 0:
+                    break
+                level += 1
+            if self.overflow and (self.now & (self.span - 1)) == 0:
+                waiting, self.overflow = self.overflow, []
+                self.pending -= len(waiting)
+                for timer in waiting:
+                    if not timer.cancelled:
+                        self._insert(timer)
+
+            slot = self.now & ((1 << self.level_bits[0]) - 1)
+            due = self.wheels[0][slot]
+            if not due:
+                continue
+            self.wheels[0][slot] = []
+            for timer in due:
+                self.pending -= 1
+                if timer.cancelled:
+                    continue
+                if timer.interval is not None:
+                    timer.expires = self.now + timer.interval
+                    self._insert(timer)
+                timer.callback(*timer.args)
+
+    def advance_time(self, dt):
+        """Advances by a (possibly fractional) number of ticks, carrying the remainder."""
+        self.fraction += dt
+        ticks = int(self.fraction)
+        self.fraction -= ticks
+        if ticks:
+            self.advance(ticks)
+
+    def clear(self):
+        for wheel in self.wheels:
+            for bucket in wheel:
+                for timer in bucket:
+                    timer.cancelled = True
+                bucket.clear()
+        for timer in self.overflow:
+            timer.cancelled = True
+        self.overflow = []
+        self.pending = 0
@@ -0,0 +1,301 @@
+"""
+Batched, headless environment for training bots on the game's levels.
+
+VecLevelEnv runs K independent copies of a level in one process and steps
+them straight through game.simulate_frame(), with no window, event queue,
+drawing or frame limiter:
+
+    env = VecLevelEnv(num_envs=16)
+    obs = env.reset(level=0, difficulty="Easy", seed=1)
+    obs, rewards, dones, infos = env.step(actions)  # actions: (K, 5) of 0/1
+
+Actions are (left, right, down, jump, cast spell) per environment.
+Observations are float32 arrays of shape (K, OBS_SIZE); see observe() for the
+layout. Environments that finish (goal, death or max_steps) are reset
+automatically with the next seed; the final observation is kept in
+infos[i]["terminal_observation"].
+
+With pixel_size=(W, H) the observations are instead uint8 camera images of
+shape (K, H, W, 3), drawn off-screen by one shared game.PixelObserver.
+
+The game keeps its timer wheel, spell/projectile groups and the random module
+as globals, so each environment owns its own copies and swaps them in while
+it is being stepped.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import contextlib
+import random
+
+import numpy as np
+import pygame
+
+import game
+from timer_wheel import TimerWheel
+
+LEFT, RIGHT, DOWN, JUMP, CAST = range(5)
+NUM_ACTIONS = 5
+NEAREST_OBSTACLES = 6
+NEAREST_PROJECTILES = 4
+OBS_SIZE = 8 + 3 + NEAREST_OBSTACLES * 4 + NEAREST_PROJECTILES * 3
+
+REWARDS = {
+    "progress": 0.01,   # per pixel closer to the goal
+    "damage": -0.05,    # per health point lost
+    "kill": 0.5,
+    "pickup": 0.2,
+    "goal": 10.0,
+    "death": -5.0,
+}
+
+_player_frames = None
+
+
+def _scaled_player_frames():
+    # Same 64x64 player the game loop uses, scaled once for every environment.
+    global _player_frames
+    if _player_frames is None:
+        _player_frames = [pygame.transform.scale(frame, (64, 64)) for frame in game.player_frames]
+    return _player_frames
+
+# --------------------
+# One Environment
+# --------------------
+class _World:
+    """One level, player and the game globals that belong to them."""
+    def __init__(self):
+        self.timers = TimerWheel()
+        self.bullets = pygame.sprite.Group()
+        self.projectiles = pygame.sprite.Group()
+        self.random_state = random.getstate()
+        self.level = None
+        self.player = None
+        self.steps = 0
+        self.goal_distance = 0.0
+
+    def bind(self):
+        game.timers = self.timers
+        game.bullet_group = self.bullets
+        game.boss_projectiles = self.projectiles
+        random.setstate(self.random_state)
+
+    def unbind(self):
+        self.random_state = random.getstate()
+
+    def reset(self, config, difficulty_multiplier, seed):
+        # Called while bound.
+        if self.level:
+            self.level.unload()
+        self.timers.clear()
+        self.bullets.empty()
+        game.clear_boss_projectiles()  # self.projectiles, while bound
+        random.seed(seed)
+        self.level = game.Level(config, difficulty_multiplier)
+        self.player = game.Player(50, game.MAP_HEIGHT - 100, frames=_scaled_player_frames())
+        self.steps = 0
+        self.goal_distance = self.distance_to_goal()
+
+    def distance_to_goal(self):
+        dx = self.level.goal.centerx - self.player.rect.centerx
+        dy = self.level.goal.centery - self.player.rect.centery
+        return (dx * dx + dy * dy) ** 0.5
+
+    def obstacle_positions(self):
+        """(N, 3) array of obstacle centres and a boss flag."""
+        level = self.level
+        rows = [(o.rect.centerx, o.rect.centery, 1.0 if isinstance(o, game.Boss) else 0.0)
+                for o in level.sprite_obstacles]
+        engine = level.obstacle_engine
+        if engine:
+            alive = engine.alive
+            engine_rows = np.column_stack((engine.x[alive] + engine.w[alive] / 2,
+                                           engine.y[alive] + engine.h[alive] / 2,
+                                           np.zeros(alive.sum())))
+            if rows:
+                return np.vstack((np.array(rows), engine_rows))
+            return engine_rows
+        return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+    def observe(self, out):
+        """
+        Fills `out` (float32, OBS_SIZE). Positions are relative to the player
+        and scaled by the map size:
+          [0:8]   player x, y, vel_y, on_ground, facing, health, mana, invulnerable
+          [8:11]  goal dx, dy, any boss alive
+          [11:35] nearest obstacles: dx, dy, present, is_boss
+          [35:47] nearest boss projectiles: dx, dy, present
+        """
+        player, level = self.player, self.level
+        map_w, map_h = game.MAP_WIDTH, game.MAP_HEIGHT
+        px, py = player.rect.centerx, player.rect.centery
+        out[:] = 0.0
+        out[0:8] = (player.rect.x / map_w, player.rect.y / map_h, player.vel_y / game.MAX_FALL_SPEED,
+                    player.on_ground, player.facing, player.health / 100, player.mana / 100,
+                    player.damage_cooldown > 0)
+        boss_alive = any(isinstance(o, game.Boss) and o.health > 0 for o in level.sprite_obstacles)
+        out[8:11] = ((level.goal.centerx - px) / map_w, (level.goal.centery - py) / map_h, boss_alive)
+
+        pos = 11
+        obstacles = self.obstacle_positions()
+        if len(obstacles):
+            rel = obstacles[:, :2] - (px, py)
+            nearest = np.argsort((rel * rel).sum(axis=1))[:NEAREST_OBSTACLES]
+            block = out[pos:pos + NEAREST_OBSTACLES * 4].reshape(NEAREST_OBSTACLES, 4)
+            block[:len(nearest), 0] = rel[nearest, 0] / map_w
+            block[:len(nearest), 1] = rel[nearest, 1] / map_h
+            block[:len(nearest), 2] = 1.0
+            block[:len(nearest), 3] = obstacles[nearest, 2]
+        pos += NEAREST_OBSTACLES * 4
+
+        if self.projectiles:
+            rel = np.array([(p.rect.centerx - px, p.rect.centery - py) for p in self.projectiles],
+                           dtype=np.float64)
+            nearest = np.argsort((rel * rel).sum(axis=1))[:NEAREST_PROJECTILES]
+            block = out[pos:pos + NEAREST_PROJECTILES * 3].reshape(NEAREST_PROJECTILES, 3)
+            block[:len(nearest), 0] = rel[nearest, 0] / map_w
+            block[:len(nearest), 1] = rel[nearest, 1] / map_h
+            block[:len(nearest), 2] = 1.0
+
+    def observe_pixels(self, observer, out):
+        out[:] = observer.render(self.level, self.player, (self.bullets, self.projectiles))
+
+    def step(self, action, dt):
+        """Returns (reward, done, info). Called while bound."""
+        player = self.player
+        if action[JUMP]:
+            player.jump()
+        if action[CAST]:
+            game.fire_spell(player)
+        events = game.simulate_frame(player, self.level, dt,
+                                     (bool(action[LEFT]), bool(action[RIGHT]), bool(action[DOWN])))
+        self.steps += 1
+
+        distance = self.distance_to_goal()
+        reward = (self.goal_distance - distance) * REWARDS["progress"]
+        self.goal_distance = distance
+        reward += events["damage"] * REWARDS["damage"]
+        reward += events["kills"] * REWARDS["kill"]
+        reward += events["pickups"] * REWARDS["pickup"]
+        info = {"steps": self.steps, "goal": events["goal"], "dead": player.health <= 0}
+        if events["goal"]:
+            reward += REWARDS["goal"]
+        if info["dead"]:
+            reward += REWARDS["death"]
+        done = events["goal"] or info["dead"]
+        return reward, done, info
+
+# --------------------
+# Batched Environment
+# --------------------
+class VecLevelEnv:
+    def __init__(self, num_envs=8, max_steps=3000, dt=1.0, quiet=True, pixel_size=None):
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+        self.dt = dt
+        self.quiet = quiet  # Swallow the game's debug prints while stepping
+        self.worlds = [_World() for _ in range(num_envs)]
+        self.config = None
+        self.difficulty_multiplier = 1.0
+        self.next_seed = 0
+        if pixel_size:
+            self.observer = game.PixelObserver(pixel_size)
+            self.obs = np.zeros((num_envs, pixel_size[1], pixel_size[0], 3), dtype=np.uint8)
+        else:
+            self.observer = None
+            self.obs = np.zeros((num_envs, OBS_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self._devnull = open(os.devnull, "w")
+
+    @contextlib.contextmanager
+    def _game_globals(self):
+        saved = (game.timers, game.bullet_group, game.boss_projectiles, random.getstate())
+        try:
+            with contextlib.redirect_stdout(self._devnull) if self.quiet else contextlib.nullcontext():
+                yield
+        finally:
+            game.timers, game.bullet_group, game.boss_projectiles, state = saved
+            random.setstate(state)
+
+    def _observe(self, world, i):
+        if self.observer:
+            world.observe_pixels(self.observer, self.obs[i])
+        else:
+            world.observe(self.obs[i])
+
+    def reset(self, level=0, difficulty="Easy", seed=0):
+        """
+        level: index into game.levels_config or a level config dict (e.g. from
+        stress_levels.generate_level). difficulty: a game.DIFFICULTY name or a
+        speed multiplier. Environment i is seeded with seed + i.
+        """
+        self.config = game.levels_config[level] if isinstance(level, int) else level
+        self.difficulty_multiplier = game.DIFFICULTY.get(difficulty, difficulty) \
+            if isinstance(difficulty, str) else difficulty
+        with self._game_globals():
+            for i, world in enumerate(self.worlds):
+                world.bind()
+                world.reset(self.config, self.difficulty_multiplier, seed + i)
+                self._observe(world, i)
+                world.unbind()
+        self.next_seed = seed + self.num_envs
+        return self.obs.copy()
+
+    def step(self, actions):
+        """actions: (K, NUM_ACTIONS) array-like of 0/1. Returns obs, rewards, dones, infos."""
+        if self.config is None:
+            raise RuntimeError("Call reset() before step()")
+        actions = np.asarray(actions, dtype=bool).reshape(self.num_envs, NUM_ACTIONS)
+        infos = []
+        with self._game_globals():
+            for i, world in enumerate(self.worlds):
+                world.bind()
+                reward, done, info = world.step(actions[i], self.dt)
+                if not done and world.steps >= self.max_steps:
+                    done = info["truncated"] = True
+                self.rewards[i] = reward
+                self.dones[i] = done
+                self._observe(world, i)
+                if done:
+                    info["terminal_observation"] = self.obs[i].copy()
+                    world.reset(self.config, self.difficulty_multiplier, self.next_seed)
+                    self.next_seed += 1
+                    self._observe(world, i)
+                world.unbind()
+                infos.append(info)
+        return self.obs.copy(), self.rewards.copy(), self.dones.copy(), infos
+
+    def close(self):
+        with self._game_globals():
+            for world in self.worlds:
+                if world.level:
+                    world.bind()
+                    world.level.unload()
+                    world.timers.clear()
+                    world.unbind()
+        self._devnull.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Measure headless environment throughput with random actions.")
+    parser.add_argument("--envs", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--level", type=int, default=0)
+    parser.add_argument("--pixels", type=int, nargs=2, metavar=("W", "H"),
+                        help="pixel observations of this size, e.g. 84 84")
+    args = parser.parse_args()
+
+    env = VecLevelEnv(args.envs, pixel_size=tuple(args.pixels) if args.pixels else None)
+    env.reset(args.level, seed=0)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        env.step(rng.random((args.envs, NUM_ACTIONS)) < 0.3)
+    elapsed = time.perf_counter() - start
+    print(f"{args.envs * args.steps / elapsed:,.0f} env steps/s ({args.envs} envs x {args.steps} steps)")
+    env.close()